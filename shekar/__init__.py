@@ -1,8 +1,21 @@
-from .pipeline import Pipeline
-from .base import BaseTransformer, BaseTextTransformer
-from .spell_checker import SpellChecker
-from .normalizer import Normalizer
-from .embeddings import Embedder
+import importlib
+
+# Public names are resolved on first access, so that `import shekar` does not pull in
+# heavy dependencies such as gensim for users who only need the normalizer.
+_lazy_imports = {
+    "Pipeline": "shekar.pipeline",
+    "BaseTransformer": "shekar.base",
+    "BaseTextTransformer": "shekar.base",
+    "SpellChecker": "shekar.spell_checker",
+    "Normalizer": "shekar.normalizer",
+    "Embedder": "shekar.embeddings",
+    "Lemmatizer": "shekar.lemmatizer",
+    "TextBatch": "shekar.batch",
+    "MinHashDeduplicator": "shekar.deduplication",
+    "VocabularyBuilder": "shekar.corpus",
+    "ShardedJob": "shekar.jobs",
+    "HashingVectorizer": "shekar.vectorizers",
+}
 
 __all__ = [
     "Pipeline",
@@ -11,4 +24,22 @@ __all__ = [
     "SpellChecker",
     "Normalizer",
     "Embedder",
+    "Lemmatizer",
+    "TextBatch",
+    "MinHashDeduplicator",
+    "VocabularyBuilder",
+    "ShardedJob",
+    "HashingVectorizer",
 ]
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        value = getattr(importlib.import_module(_lazy_imports[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import sys
+
+
+def serve(args):
+    from shekar.corpus import read_frequencies
+    from shekar.server import NormalizationServer
+
+    server = NormalizationServer(
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_delay=args.max_delay / 1000,
+        workers=args.workers,
+        spell_checker_words=read_frequencies(args.words) if args.words else None,
+    )
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def vocab(args):
+    from shekar.corpus import VocabularyBuilder
+
+    builder = VocabularyBuilder(
+        min_count=args.min_count,
+        n_jobs=args.jobs,
+        memory_budget=args.memory_budget * 1024**2,
+    )
+    with open(args.input, encoding="utf-8") if args.input != "-" else sys.stdin as f:
+        n_words = builder.build_to_file(f, args.output)
+    print(f"Wrote {n_words} words to {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="shekar")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run a local micro-batching HTTP server."
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument(
+        "--max-batch-size", type=int, default=64, help="Maximum texts per batch."
+    )
+    serve_parser.add_argument(
+        "--max-delay",
+        type=float,
+        default=5.0,
+        help="Maximum time in milliseconds a request waits for its batch to fill.",
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes, 0 to run batches on a thread.",
+    )
+    serve_parser.add_argument(
+        "--words",
+        help='Word frequencies ("word<TAB>count" per line) enabling /spellcheck.',
+    )
+    serve_parser.set_defaults(function=serve)
+
+    vocab_parser = subparsers.add_parser(
+        "vocab", help="Count the word frequencies of a corpus, one text per line."
+    )
+    vocab_parser.add_argument("input", help='The corpus file, or "-" for stdin.')
+    vocab_parser.add_argument("-o", "--output", required=True)
+    vocab_parser.add_argument("--min-count", type=int, default=1)
+    vocab_parser.add_argument(
+        "--jobs", type=int, default=1, help="Number of worker processes."
+    )
+    vocab_parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=1024,
+        help="Memory in MiB the counts may use before they are spilled to disk.",
+    )
+    vocab_parser.set_defaults(function=vocab)
+
+    args = parser.parse_args(argv)
+    args.function(args)
+
+
+if __name__ == "__main__":
+    main()
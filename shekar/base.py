@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from typing import Iterable, List
 import regex as re
 
+from shekar.batch import TextBatch
+
 
 class BaseTransformer(ABC):
     @abstractmethod
@@ -21,6 +23,13 @@ class BaseTransformer(ABC):
 
 
 class BaseTextTransformer(BaseTransformer):
+    # True if _function never matches across whitespace, so a TextBatch can be
+    # transformed with a single call on its whole buffer
+    batchable = False
+    # True if _function maps every whitespace-separated token independently and keeps the
+    # whitespace, so it can run once per distinct token (see Pipeline.transform_corpus)
+    token_local = False
+
     @abstractmethod
     def _function(self, X: str, y=None) -> str:
         pass
@@ -28,6 +37,10 @@ class BaseTextTransformer(BaseTransformer):
     def transform(self, X: Iterable[str] | str) -> Iterable[str] | str:
         if isinstance(X, str):
             return self._function(X)
+        elif isinstance(X, TextBatch):
+            if self.batchable:
+                return X.map_buffer(self._function)
+            return X.map(self._function)
         elif isinstance(X, Iterable):
             return (self._function(x) for x in X)
         else:
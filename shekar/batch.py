@@ -0,0 +1,106 @@
+from array import array
+from typing import Callable, Iterable
+
+
+class TextBatch:
+    """
+    A batch of texts stored as one contiguous buffer plus an offsets array, like an Arrow string array.
+    The texts are joined by a paragraph separator (U+2029), a whitespace character that no
+    normalization step rewrites, so a step that never matches across whitespace can transform
+    the whole batch with a single call on the buffer instead of one call per text.
+    Example:
+        >>> batch = TextBatch.from_texts(["سلام", "دنیا"])
+        >>> Normalizer().normalize(batch).to_list()
+        ['سلام', 'دنیا']
+    """
+
+    separator = "\u2029"
+
+    def __init__(self, buffer: str, offsets: array):
+        """
+        Args:
+            buffer (str): The texts joined by the separator.
+            offsets (array): The start of every text in the buffer, followed by len(buffer) + 1.
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+        # a text containing the separator itself would be split by bulk transforms
+        self._separable = buffer.count(self.separator) == len(offsets) - 2
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "TextBatch":
+        """
+        Build a batch from texts.
+        Args:
+            texts (Iterable[str]): The texts.
+        Returns:
+            TextBatch: The batch.
+        """
+        texts = texts if isinstance(texts, list) else list(texts)
+        offsets = array("q", [0])
+        offsets.extend(len(text) + 1 for text in texts)
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+        return cls(cls.separator.join(texts), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("TextBatch index out of range")
+        return self.buffer[self.offsets[i] : self.offsets[i + 1] - 1]
+
+    def __iter__(self):
+        if self._separable:
+            return iter(self.buffer.split(self.separator) if len(self) else [])
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TextBatch):
+            return NotImplemented
+        return self.to_list() == other.to_list()
+
+    def __repr__(self) -> str:
+        return f"TextBatch({len(self)} texts, {len(self.buffer)} characters)"
+
+    def to_list(self) -> list[str]:
+        return list(self)
+
+    def map(self, function: Callable[[str], str]) -> "TextBatch":
+        """
+        Apply a function to every text.
+        Args:
+            function (Callable[[str], str]): The function.
+        Returns:
+            TextBatch: The transformed batch.
+        """
+        return TextBatch.from_texts([function(text) for text in self])
+
+    def map_buffer(self, function: Callable[[str], str]) -> "TextBatch":
+        """
+        Apply a function to the whole buffer at once.
+        The function must leave the separators in place, which holds for functions that never
+        match across whitespace. Otherwise it is applied to every text instead.
+        Args:
+            function (Callable[[str], str]): The function.
+        Returns:
+            TextBatch: The transformed batch.
+        """
+        if not self._separable or len(self) == 0:
+            return self.map(function)
+
+        buffer = function(self.buffer)
+        offsets = array("q", [0])
+        find = buffer.find
+        position = find(self.separator)
+        while position != -1:
+            offsets.append(position + 1)
+            position = find(self.separator, position + 1)
+        offsets.append(len(buffer) + 1)
+
+        if len(offsets) != len(self.offsets):
+            return self.map(function)
+        return TextBatch(buffer, offsets)
@@ -0,0 +1,194 @@
+import heapq
+import shutil
+import tempfile
+from collections import Counter
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from shekar.batch import TextBatch
+from shekar.normalizer import Normalizer
+from shekar.tokenizers import WordTokenizer
+from shekar.utils import parallel_map
+
+
+def _count_chunk(normalizer: Normalizer, texts: list[str]) -> Counter:
+    batch = TextBatch.from_texts(texts)
+    if normalizer is not None:
+        batch = normalizer.normalize(batch)
+    # the separators between texts and whitespace come out as tokens of their own
+    counts = Counter(WordTokenizer.pattern.findall(batch.buffer))
+    for token in [token for token in counts if token.isspace()]:
+        del counts[token]
+    return counts
+
+
+def read_frequencies(path, min_count: int = 1) -> Counter:
+    """
+    Read word frequencies from a file with one "word<TAB>count" pair per line.
+    Args:
+        path (str | Path): The frequency file, e.g. written by VocabularyBuilder.
+        min_count (int, optional): The minimum count of the words to keep. Defaults to 1.
+    Returns:
+        Counter: The word frequencies.
+    """
+    words = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            word, _, count = line.rstrip("\n").partition("\t")
+            if word:
+                words[word] += int(count or 1)
+    if min_count > 1:
+        words = Counter({w: c for w, c in words.items() if c >= min_count})
+    return words
+
+
+def write_frequencies(counts: Iterable[tuple[str, int]], path) -> int:
+    """
+    Write word frequencies as one "word<TAB>count" pair per line.
+    Args:
+        counts (Iterable[tuple[str, int]]): The words and their counts.
+        path (str | Path): The destination path.
+    Returns:
+        int: The number of words written.
+    """
+    n_words = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for word, count in counts:
+            f.write(f"{word}\t{count}\n")
+            n_words += 1
+    return n_words
+
+
+class VocabularyBuilder:
+    """
+    Counts word frequencies over a corpus with a parallel map-reduce.
+    Chunks of texts are normalized and tokenized in worker processes, and their partial counts
+    are merged in a tree, so that every count is merged into counts of similar size.
+    When the vocabulary grows beyond the memory budget, it is spilled to disk as a sorted run,
+    and the runs are merged in a single streaming pass at the end.
+    The output is a "word<TAB>count" file that SpellChecker.from_frequencies and the vocabulary
+    argument of Embedder read directly.
+    Example:
+        >>> builder = VocabularyBuilder(min_count=2, n_jobs=4)
+        >>> builder.build_to_file(open("corpus.txt", encoding="utf-8"), "frequencies.tsv")
+    """
+
+    # approximate size in bytes of a Counter entry holding a short word
+    _entry_size = 160
+
+    def __init__(
+        self,
+        normalizer: Normalizer = None,
+        min_count: int = 1,
+        n_jobs: int = 1,
+        chunk_size: int = 10000,
+        memory_budget: int = 1024**3,
+        spill_dir=None,
+    ):
+        """
+        Args:
+            normalizer (Normalizer, optional): The normalizer applied before tokenization. Defaults to Normalizer().
+            min_count (int, optional): The minimum count of the words to keep. Defaults to 1.
+            n_jobs (int, optional): The number of worker processes, 1 to count in the calling process. Defaults to 1.
+            chunk_size (int, optional): The number of texts per task. Defaults to 10000.
+            memory_budget (int, optional): The approximate memory in bytes the merged counts may use
+                before they are spilled to disk. Defaults to 1 GiB.
+            spill_dir (str | Path, optional): The directory of the spilled runs. Defaults to a temporary directory.
+        """
+        self.normalizer = normalizer if normalizer is not None else Normalizer()
+        self.min_count = min_count
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.spilled_runs = 0
+
+    def _partial_counts(self, texts: Iterable[str]) -> Iterator[Counter]:
+        texts = iter(texts)
+        chunks = iter(lambda: list(islice(texts, self.chunk_size)), [])
+        return parallel_map(_count_chunk, chunks, self.normalizer, self.n_jobs)
+
+    def _sorted_counts(self, texts: Iterable[str], spill_dir: Path):
+        # binary-counter tree: a partial count is merged into its neighbour of the same level
+        stack = []
+        runs = []
+        max_words = max(1, self.memory_budget // self._entry_size)
+        for counts in self._partial_counts(texts):
+            level = 0
+            while stack and stack[-1][0] == level:
+                counts.update(stack.pop()[1])
+                level += 1
+            stack.append((level, counts))
+
+            if sum(len(c) for _, c in stack) > max_words:
+                counts = stack.pop()[1]
+                for _, partial in stack:
+                    counts.update(partial)
+                stack = []
+                runs.append(self._spill(counts, spill_dir / f"run{len(runs)}.tsv"))
+
+        counts = Counter()
+        for _, partial in reversed(stack):
+            counts.update(partial)
+        self.spilled_runs = len(runs)
+        if not runs:
+            return sorted(counts.items())
+
+        runs.append(sorted(counts.items()))
+        merged = heapq.merge(*runs, key=lambda item: item[0])
+        return (
+            (word, sum(count for _, count in group))
+            for word, group in groupby(merged, key=lambda item: item[0])
+        )
+
+    @staticmethod
+    def _spill(counts: Counter, path: Path) -> Iterator[tuple[str, int]]:
+        write_frequencies(sorted(counts.items()), path)
+        counts.clear()
+
+        def run():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    word, _, count = line.rstrip("\n").partition("\t")
+                    yield word, int(count)
+
+        return run()
+
+    def build_to_file(self, texts: Iterable[str], path) -> int:
+        """
+        Count the words of a corpus and write their frequencies, sorted by word.
+        Args:
+            texts (Iterable[str]): The texts of the corpus, e.g. the lines of an open file.
+            path (str | Path): The destination frequency file.
+        Returns:
+            int: The number of words written.
+        """
+        spill_dir = Path(tempfile.mkdtemp(prefix="shekar-vocab-", dir=self.spill_dir))
+        try:
+            counts = self._sorted_counts(texts, spill_dir)
+            return write_frequencies(
+                ((w, c) for w, c in counts if c >= self.min_count), path
+            )
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def build(self, texts: Iterable[str]) -> Counter:
+        """
+        Count the words of a corpus in memory.
+        Args:
+            texts (Iterable[str]): The texts of the corpus.
+        Returns:
+            Counter: The word frequencies, which can be passed to SpellChecker(words=...).
+        """
+        spill_dir = Path(tempfile.mkdtemp(prefix="shekar-vocab-", dir=self.spill_dir))
+        try:
+            return Counter(
+                {
+                    w: c
+                    for w, c in self._sorted_counts(texts, spill_dir)
+                    if c >= self.min_count
+                }
+            )
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
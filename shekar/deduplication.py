@@ -0,0 +1,282 @@
+import pickle
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from shekar.base import BaseTransformer
+from shekar.batch import TextBatch
+from shekar.normalizer import Normalizer
+from shekar.tokenizers import WordTokenizer
+
+_mersenne_prime = np.uint64((1 << 61) - 1)
+_max_hash = np.uint64((1 << 32) - 1)
+
+
+class MinHashDeduplicator(BaseTransformer):
+    """
+    Streaming near-duplicate detection with MinHash signatures and LSH banding.
+    Texts are normalized, split into word shingles and hashed into a MinHash signature.
+    The signature is cut into bands, and a text whose band matches an earlier text and whose
+    estimated Jaccard similarity with it reaches the threshold is a near-duplicate.
+    The index keeps the signatures of at most max_index_size texts, evicting the least recently
+    matched ones, and can be saved and loaded to deduplicate a stream across several runs.
+    Example:
+        >>> deduplicator = MinHashDeduplicator()
+        >>> list(deduplicator.filter(["کتاب را خواندم", "كتاب را خواندم", "متن دیگری است"]))
+        ['کتاب را خواندم', 'متن دیگری است']
+    """
+
+    snapshot_format_version = 2
+    _block_shingles = 1 << 15
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.8,
+        max_index_size: int = 1_000_000,
+        normalizer: Normalizer = None,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            num_perm (int, optional): The number of hash permutations of a signature. Defaults to 128.
+            bands (int, optional): The number of LSH bands, must divide num_perm. More bands find
+                less similar candidates. Defaults to 16.
+            shingle_size (int, optional): The number of words per shingle. Defaults to 3.
+            threshold (float, optional): The minimum estimated Jaccard similarity of near-duplicates. Defaults to 0.8.
+            max_index_size (int, optional): The maximum number of texts kept in the index. Defaults to 1,000,000.
+            normalizer (Normalizer, optional): The normalizer applied before shingling. Defaults to Normalizer().
+            seed (int, optional): The seed of the hash permutations. Defaults to 1.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands.")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_index_size = max_index_size
+        self.normalizer = normalizer if normalizer is not None else Normalizer()
+        self.tokenizer = WordTokenizer()
+
+        # (a * h + b) mod p with a, h < 2^32 never overflows 64 bits
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+
+        # id -> signature, least recently matched first
+        self._signatures = OrderedDict()
+        # band key -> id, or the set of ids when several texts share the key
+        self._buckets = [{} for _ in range(bands)]
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _shingle_hashes(self, text: str) -> list[int]:
+        tokens = self.tokenizer.tokenize(text)
+        k = self.shingle_size
+        if len(tokens) <= k:
+            shingles = [" ".join(tokens)]
+        else:
+            shingles = {" ".join(tokens[i : i + k]) for i in range(len(tokens) - k + 1)}
+        # crc32 is stable across processes, unlike hash()
+        return [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Compute the MinHash signatures of texts.
+        Args:
+            texts (Iterable[str]): The texts.
+        Returns:
+            np.ndarray: A (len(texts), num_perm) array of uint32 signatures. Texts dropped by a gate of
+                the normalizer, such as ScriptRatioGate, get the signature of a text without shingles.
+        """
+        texts = list(texts)
+        normalized = list(self.normalizer.normalize(TextBatch.from_texts(texts)))
+        if len(normalized) != len(texts):
+            # a gate dropped some texts, so they are normalized one by one to keep the rows aligned
+            normalized = [self.normalizer.normalize(text) for text in texts]
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+
+        # a text without shingles keeps the maximal signature, the minimum over an empty set
+        signatures = np.full((len(texts), self.num_perm), _max_hash, dtype=np.uint32)
+        rows = [i for i, text in enumerate(normalized) if text is not None]
+        hashes = [self._shingle_hashes(normalized[i]) for i in rows]
+        start = 0
+        while start < len(hashes):
+            # the permuted block is num_perm x shingles, so long texts are processed in fewer per block
+            end, size = start, 0
+            while end < len(hashes) and (end == start or size < self._block_shingles):
+                size += len(hashes[end])
+                end += 1
+
+            lengths = np.array([len(h) for h in hashes[start:end]], dtype=np.int64)
+            offsets = np.concatenate(([0], np.cumsum(lengths[:-1])))
+            values = np.fromiter(
+                (h for shingles in hashes[start:end] for h in shingles),
+                dtype=np.uint64,
+                count=size,
+            )
+            permuted = (self._a * values + self._b) % _mersenne_prime & _max_hash
+            signatures[rows[start:end]] = np.minimum.reduceat(
+                permuted, offsets, axis=1
+            ).T
+            start = end
+        return signatures
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        data = signature.tobytes()
+        width = 4 * self.rows
+        return [data[i * width : (i + 1) * width] for i in range(self.bands)]
+
+    def _query(self, signature: np.ndarray, keys: list[bytes]):
+        checked = set()
+        for band, key in enumerate(keys):
+            ids = self._buckets[band].get(key)
+            if ids is None:
+                continue
+            for candidate in ids if isinstance(ids, set) else (ids,):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = np.mean(self._signatures[candidate] == signature)
+                if similarity >= self.threshold:
+                    return candidate
+        return None
+
+    def _insert(self, signature: np.ndarray, keys: list[bytes]):
+        doc_id = self._next_id
+        self._next_id += 1
+        # a copy, so that the index does not keep the whole batch array alive
+        self._signatures[doc_id] = signature.copy()
+        for band, key in enumerate(keys):
+            bucket = self._buckets[band]
+            ids = bucket.get(key)
+            if ids is None:
+                # most keys hold a single id, which is much smaller than a set
+                bucket[key] = doc_id
+            elif isinstance(ids, set):
+                ids.add(doc_id)
+            else:
+                bucket[key] = {ids, doc_id}
+
+        while len(self._signatures) > self.max_index_size:
+            evicted, evicted_signature = self._signatures.popitem(last=False)
+            for band, key in enumerate(self._band_keys(evicted_signature)):
+                bucket = self._buckets[band]
+                ids = bucket[key]
+                if not isinstance(ids, set):
+                    del bucket[key]
+                    continue
+                ids.discard(evicted)
+                if len(ids) == 1:
+                    bucket[key] = ids.pop()
+
+    def _check(self, signature: np.ndarray) -> bool:
+        keys = self._band_keys(signature)
+        duplicate_of = self._query(signature, keys)
+        if duplicate_of is not None:
+            self._signatures.move_to_end(duplicate_of)
+            return True
+        self._insert(signature, keys)
+        return False
+
+    def flag(self, texts: Iterable[str], batch_size: int = 1024) -> Iterator[bool]:
+        """
+        Flag the near-duplicates of a stream of texts.
+        Every text that is not a near-duplicate of an earlier one is added to the index.
+        Args:
+            texts (Iterable[str]): The texts.
+            batch_size (int, optional): The number of texts whose signatures are computed at once. Defaults to 1024.
+        Returns:
+            Iterator[bool]: True for every text that is a near-duplicate of an earlier text.
+        """
+        for batch in self._batches(texts, batch_size):
+            for signature in self.signatures(batch):
+                yield self._check(signature)
+
+    def filter(self, texts: Iterable[str], batch_size: int = 1024) -> Iterator[str]:
+        """
+        Drop the near-duplicates of a stream of texts.
+        Args:
+            texts (Iterable[str]): The texts.
+            batch_size (int, optional): The number of texts whose signatures are computed at once. Defaults to 1024.
+        Returns:
+            Iterator[str]: The texts that are not near-duplicates of an earlier text.
+        """
+        for batch in self._batches(texts, batch_size):
+            for text, signature in zip(batch, self.signatures(batch)):
+                if not self._check(signature):
+                    yield text
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        Check whether a text is a near-duplicate of an earlier one, adding it to the index if not.
+        Args:
+            text (str): The text.
+        Returns:
+            bool: True if the text is a near-duplicate.
+        """
+        return self._check(self.signatures([text])[0])
+
+    @staticmethod
+    def _batches(texts: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def transform(self, X: Iterable[str]) -> Iterator[str]:
+        if isinstance(X, str):
+            raise ValueError("Input must be an Iterable of strings.")
+        return self.filter(X)
+
+    def fit(self, X, y=None):
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self.transform(X)
+
+    def save(self, path):
+        """
+        Save the deduplicator with its index, to resume deduplication later.
+        Args:
+            path (str | Path): The destination path.
+        """
+        with open(path, "wb") as f:
+            pickle.dump(
+                {"format": self.snapshot_format_version},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path) -> "MinHashDeduplicator":
+        """
+        Load a deduplicator saved with MinHashDeduplicator.save.
+        Args:
+            path (str | Path): The snapshot path.
+        Returns:
+            MinHashDeduplicator: The restored deduplicator.
+        """
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("format") != cls.snapshot_format_version:
+                raise ValueError(f"Unsupported deduplicator snapshot format in {path}.")
+            deduplicator = pickle.load(f)
+
+        if not isinstance(deduplicator, cls):
+            raise ValueError(f"{path} is not a {cls.__name__} snapshot.")
+        return deduplicator
@@ -1,9 +1,37 @@
 import os
+import time
 import urllib.request
-from gensim.models import KeyedVectors
 import gzip
+import pickle
 import shutil
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from shekar.preprocessing import KeyNormalizer
+from shekar.metrics import registry as _metrics
+
+_lookups = _metrics.counter(
+    "shekar_embedder_lookups_total",
+    "Embedder word lookups by result: hit, normalized_hit or oov.",
+    ("model", "result"),
+)
+_lookup_seconds = _metrics.histogram(
+    "shekar_embedder_lookup_seconds", "Latency of Embedder word lookups.", ("model",)
+)
+_load_seconds = _metrics.histogram(
+    "shekar_model_load_seconds",
+    "Time to load a model, including any download.",
+    ("model",),
+)
+_download_seconds = _metrics.histogram(
+    "shekar_model_download_seconds", "Time to download a model.", ("url",)
+)
+_download_bytes = _metrics.counter(
+    "shekar_model_download_bytes_total", "Bytes of downloaded models.", ("url",)
+)
+_vocabulary_size = _metrics.gauge(
+    "shekar_embedder_vocabulary_size", "Words in the loaded Embedder model.", ("model",)
+)
 
 
 class Embedder:
@@ -12,27 +40,66 @@ class Embedder:
         "fasttext-d100-w10-cbow-blogs": "https://amirivojdan.io/shekar-data/fasttext_d100_w10_cbow_blogs.vec.gz",
     }
 
-    def __init__(self, model_name: str = "fasttext-d100-w10-cbow-blogs"):
+    cache_dir = Path.home() / ".shekar"
+    lookup_index_version = 1
+
+    def __init__(
+        self, model_name: str = "fasttext-d100-w10-cbow-blogs", vocabulary=None
+    ):
         """
         Initialize the Embedding instance.
         Args:
             model (str, optional): The name of the model to load. Defaults to "fasttext-300-naab".
+            vocabulary (Iterable[str] | str | Path, optional): Restricts the model to these words, or to the
+                words of a frequency file written by VocabularyBuilder, which saves memory and speeds up
+                similarity searches. Variants of the words with the same normalized form are kept. Defaults to None.
         """
 
+        self.model_name = model_name
+        self._key_normalizer = KeyNormalizer()
+        self._restricted = vocabulary is not None
         self.model = self.load_model(model_name)
+        if vocabulary is not None:
+            self.model = self._restrict(self.model, vocabulary)
+        if _metrics.enabled and self.model is not None:
+            _vocabulary_size.labels(model_name).set(len(self.model.index_to_key))
+        self._unit_vectors = None
+        self._lookup_index = None
+
+    def _restrict(self, model, vocabulary):
+        from gensim.models import KeyedVectors
+
+        if isinstance(vocabulary, (str, Path)):
+            from shekar.corpus import read_frequencies
+
+            vocabulary = read_frequencies(vocabulary)
+        keys = {self._key_normalizer(word) for word in vocabulary}
+        rows = [
+            row
+            for row, word in enumerate(model.index_to_key)
+            if word in keys or self._key_normalizer(word) in keys
+        ]
+
+        restricted = KeyedVectors(vector_size=model.vector_size)
+        restricted.add_vectors(
+            [model.index_to_key[row] for row in rows], model.vectors[rows]
+        )
+        return restricted
 
     def __getitem__(self, word: str):
         """
         Get the vector representation of the specified word.
+        Words missing from the vocabulary are looked up again by their normalized form,
+        so spelling variants such as Arabic letters, diacritics or ZWNJs still resolve.
         Args:
             word (str): The word to get its vector representation.
         Returns:
             numpy.ndarray: The vector representation of the specified word.
         """
-        try:
-            return self.model[word]
-        except KeyError:
+        index = self._resolve_index(word)
+        if index is None:
             return None
+        return self.model.vectors[index]
 
     def most_similar(self, word: str, topn: int = 10):
         """
@@ -44,10 +111,213 @@ class Embedder:
             list: The list of the top N most similar words to the specified word.
         """
 
-        try:
-            return self.model.most_similar(word, topn=topn)
-        except KeyError:
+        index = self._resolve_index(word)
+        if index is None:
             return None
+        return self.model.most_similar(self.model.index_to_key[index], topn=topn)
+
+    def most_similar_batch(
+        self,
+        words: list[str],
+        topn: int = 10,
+        memory_budget: int = 256 * 1024**2,
+        n_jobs: int = 1,
+    ):
+        """
+        Get the top N most similar words for each of the specified words.
+        The search is exact: it computes the cosine similarity of every query against the
+        whole vocabulary, one block of queries at a time.
+        Args:
+            words (list[str]): The words to find their most similar words.
+            topn (int, optional): The number of most similar words to return per word. Defaults to 10.
+            memory_budget (int, optional): The approximate peak memory in bytes of the blocks being searched,
+                counting the similarity scores and their argpartition indices. Defaults to 256 MiB.
+            n_jobs (int, optional): The number of threads used to process the blocks. Defaults to 1.
+        Returns:
+            list: For each word, the list of its top N most similar words as (word, similarity) pairs,
+            or None if the word is not in the vocabulary.
+        """
+        unit_vectors = self._get_unit_vectors()
+        indices = [self._resolve_index(word) for word in words]
+        known = np.array([i for i in indices if i is not None], dtype=np.int64)
+
+        results = [None] * len(words)
+        if len(known) == 0:
+            return results
+
+        # every row of a block holds its scores and the int64 indices of argpartition,
+        # and n_jobs blocks are searched at once
+        block_size = self._block_size(
+            len(unit_vectors),
+            unit_vectors.itemsize + np.dtype(np.int64).itemsize,
+            memory_budget // max(1, n_jobs),
+        )
+        # one extra candidate per row so the query word itself can be dropped
+        k = min(topn + 1, len(unit_vectors))
+
+        def search(start):
+            rows = known[start : start + block_size]
+            # negated in place, so that the smallest scores are the most similar words
+            scores = unit_vectors[rows] @ unit_vectors.T
+            np.negative(scores, out=scores)
+            top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            del scores
+            order = np.argsort(top_scores, axis=1)
+            return (
+                rows,
+                np.take_along_axis(top, order, axis=1),
+                -np.take_along_axis(top_scores, order, axis=1),
+            )
+
+        starts = range(0, len(known), block_size)
+        if n_jobs > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                blocks = list(executor.map(search, starts))
+        else:
+            blocks = [search(start) for start in starts]
+
+        neighbours = {}
+        index_to_key = self.model.index_to_key
+        for rows, top, top_scores in blocks:
+            for row, candidates, scores in zip(rows, top, top_scores):
+                neighbours[row] = [
+                    (index_to_key[candidate], float(score))
+                    for candidate, score in zip(candidates, scores)
+                    if candidate != row
+                ][:topn]
+
+        for position, index in enumerate(indices):
+            if index is not None:
+                results[position] = neighbours[index]
+        return results
+
+    def similarity_matrix(
+        self,
+        words_a: list[str],
+        words_b: list[str],
+        memory_budget: int = 256 * 1024**2,
+        n_jobs: int = 1,
+    ):
+        """
+        Compute the cosine similarity between every pair of words from two lists.
+        Args:
+            words_a (list[str]): The words of the rows.
+            words_b (list[str]): The words of the columns.
+            memory_budget (int, optional): The approximate peak memory in bytes of the blocks being computed,
+                besides the result itself. Defaults to 256 MiB.
+            n_jobs (int, optional): The number of threads used to process the blocks. Defaults to 1.
+        Returns:
+            numpy.ndarray: A matrix of shape (len(words_a), len(words_b)). Rows and columns of
+            out-of-vocabulary words are filled with NaN.
+        """
+        unit_vectors = self._get_unit_vectors()
+        rows = [self._resolve_index(word) for word in words_a]
+        columns = [self._resolve_index(word) for word in words_b]
+        known_rows = np.array([i is not None for i in rows], dtype=bool)
+        known_columns = np.array([i is not None for i in columns], dtype=bool)
+
+        vectors_a = unit_vectors[[i for i in rows if i is not None]]
+        vectors_b = unit_vectors[[i for i in columns if i is not None]]
+
+        result = np.full((len(words_a), len(words_b)), np.nan, dtype=unit_vectors.dtype)
+        if len(vectors_a) == 0 or len(vectors_b) == 0:
+            return result
+
+        # blocks of rows are computed and scattered straight into the result
+        block_size = self._block_size(
+            len(vectors_b), unit_vectors.itemsize, memory_budget // max(1, n_jobs)
+        )
+        row_positions = np.flatnonzero(known_rows)
+        column_positions = np.flatnonzero(known_columns)
+        all_columns = len(column_positions) == len(words_b)
+
+        def compute(start):
+            end = start + block_size
+            block = vectors_a[start:end] @ vectors_b.T
+            if all_columns:
+                result[row_positions[start:end]] = block
+            else:
+                result[np.ix_(row_positions[start:end], column_positions)] = block
+
+        starts = range(0, len(vectors_a), block_size)
+        if n_jobs > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(compute, starts))
+        else:
+            for start in starts:
+                compute(start)
+        return result
+
+    def _resolve_index(self, word: str):
+        start = time.perf_counter() if _metrics.enabled else None
+        index = self.model.key_to_index.get(word)
+        result = "hit"
+        if index is None:
+            index = self._get_lookup_index().get(self._key_normalizer(word))
+            result = "oov" if index is None else "normalized_hit"
+        if start is not None:
+            _lookups.labels(self.model_name, result).inc()
+            _lookup_seconds.labels(self.model_name).observe(time.perf_counter() - start)
+        return index
+
+    def _get_lookup_index(self):
+        if self._lookup_index is None:
+            self._lookup_index = self._load_lookup_index()
+        return self._lookup_index
+
+    def _load_lookup_index(self):
+        """
+        Load the index from normalized keys to vocabulary rows, building and caching it on disk if needed.
+        Returns:
+            dict: A mapping from the normalized form of each vocabulary entry to its row.
+        """
+        index_path = self.cache_dir / (self.model_name.replace("-", "_") + ".index.pkl")
+        if self._restricted:
+            # the index of a restricted model is small and must not replace the cached full index
+            index_path = None
+        elif index_path.exists():
+            try:
+                with open(index_path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached["version"] == self.lookup_index_version and cached[
+                    "vocab_size"
+                ] == len(self.model.index_to_key):
+                    return cached["index"]
+            except Exception:
+                pass
+
+        index = {}
+        for row, key in enumerate(self.model.index_to_key):
+            # entries are sorted by frequency, so the most frequent variant wins
+            index.setdefault(self._key_normalizer(key), row)
+
+        if index_path is None:
+            return index
+        try:
+            with open(index_path, "wb") as f:
+                pickle.dump(
+                    {
+                        "version": self.lookup_index_version,
+                        "vocab_size": len(self.model.index_to_key),
+                        "index": index,
+                    },
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except OSError:
+            pass
+        return index
+
+    def _get_unit_vectors(self):
+        # cached, since normalizing the whole vocabulary is as costly as a batch of queries
+        if self._unit_vectors is None:
+            self._unit_vectors = self.model.get_normed_vectors()
+        return self._unit_vectors
+
+    @staticmethod
+    def _block_size(n_columns: int, itemsize: int, memory_budget: int) -> int:
+        return max(1, memory_budget // max(1, n_columns * itemsize))
 
     def load_model(self, model_name: str):
         """
@@ -57,9 +327,12 @@ class Embedder:
         Returns:
             gensim.models.KeyedVectors: The loaded model.
         """
+        from gensim.models import KeyedVectors
+
+        start = time.perf_counter()
         model_url = self.available_models[model_name]
         model_file_name = model_name.replace("-", "_") + ".vec.gz"
-        cache_dir = Path.home() / ".shekar"
+        cache_dir = self.cache_dir
         model_zip_path = cache_dir / model_file_name
         model_path = model_zip_path.with_suffix("")  # Remove .gz
 
@@ -77,9 +350,12 @@ class Embedder:
             os.remove(model_zip_path)
 
         try:
-            return KeyedVectors.load_word2vec_format(model_path, binary=True)
+            model = KeyedVectors.load_word2vec_format(model_path, binary=True)
         except Exception:
             return None
+        if _metrics.enabled:
+            _load_seconds.labels(model_name).observe(time.perf_counter() - start)
+        return model
 
     @staticmethod
     def download_model(url: str, dest_path: Path):
@@ -89,6 +365,7 @@ class Embedder:
             url (str): The URL of the model to download.
             dest_path (Path): The destination path to save the downloaded model.
         """
+        start = time.perf_counter()
         try:
             req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
             with urllib.request.urlopen(req) as response:
@@ -111,7 +388,10 @@ class Embedder:
                                 f"\r[{'=' * done}{' ' * (50 - done)}] {done * 2}%",
                                 end="",
                             )
-                    return True
+                if _metrics.enabled:
+                    _download_seconds.labels(url).observe(time.perf_counter() - start)
+                    _download_bytes.labels(url).inc(os.path.getsize(dest_path))
+                return True
         except Exception as e:
             print(f"Error downloading the model: {e}")
             return False
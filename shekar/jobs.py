@@ -0,0 +1,251 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from shekar.normalizer import Normalizer
+from shekar.pipeline import Pipeline
+
+_worker_state = {}
+
+
+class Shard(NamedTuple):
+    name: str
+    input: str
+    start: int
+    end: int
+
+
+def _init_worker(pipeline):
+    _worker_state["pipeline"] = pipeline
+
+
+def _process_shard(shard: Shard, output_path: str) -> int:
+    with open(shard.input, "rb") as f:
+        f.seek(shard.start)
+        data = f.read(shard.end - shard.start)
+    # str.splitlines would also split at separators such as U+2028 inside a text
+    lines = [line.removesuffix("\r") for line in data.decode("utf-8").split("\n")]
+    if data.endswith(b"\n"):
+        lines.pop()
+
+    outputs = _worker_state["pipeline"].transform_corpus(lines, keep_dropped=True)
+    temporary_path = output_path + ".tmp"
+    n_lines = 0
+    try:
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            for line in outputs:
+                if line is None:  # dropped by a gate, the line is kept empty
+                    line = ""
+                # a line break would split the output into several lines, out of step with the input
+                if "\n" in line or "\r" in line:
+                    raise ValueError(
+                        f"The output of line {n_lines + 1} of shard {shard.name} of {shard.input} "
+                        "contains a line break, the pipeline must map every line to a single line."
+                    )
+                f.write(line + "\n")
+                n_lines += 1
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
+    os.replace(temporary_path, output_path)
+    return n_lines
+
+
+def _atomic_write_json(data: dict, path: Path):
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+class ShardedJob:
+    """
+    A resumable job that runs a pipeline over large corpora with one text per line.
+    Every output must be a single line; a pipeline that produces a line break raises a ValueError,
+    and the lines dropped by a gate such as ScriptRatioGate are written as empty lines.
+    The input files are split into shards of shard_size lines, which are processed in parallel and
+    written atomically to the output directory. A manifest records every completed shard with the
+    fingerprint of the pipeline and the size and modification time of its input, so a restarted
+    job skips the shards that are still valid. Outputs of a changed pipeline or a changed input are
+    discarded and processed again.
+    Example:
+        >>> job = ShardedJob(Normalizer(), ["corpus-1.txt", "corpus-2.txt"], "normalized", n_jobs=8)
+        >>> job.run()
+        {'processed': 120, 'skipped': 0, 'invalidated': 0}
+    """
+
+    manifest_name = "manifest.json"
+    manifest_version = 1
+
+    def __init__(
+        self,
+        pipeline: Pipeline | Normalizer,
+        inputs: Iterable[str],
+        output_dir,
+        shard_size: int = 100_000,
+        n_jobs: int = 1,
+    ):
+        """
+        Args:
+            pipeline (Pipeline | Normalizer): The pipeline applied to every line.
+            inputs (Iterable[str | Path]): The input files.
+            output_dir (str | Path): The directory of the output shards and the manifest.
+            shard_size (int, optional): The number of lines per shard. Defaults to 100,000.
+            n_jobs (int, optional): The number of worker processes, 1 to run in the calling process. Defaults to 1.
+        """
+        if isinstance(pipeline, Normalizer):
+            pipeline = pipeline._pipeline
+        self.pipeline = pipeline
+        self.inputs = [str(path) for path in inputs]
+        self.output_dir = Path(output_dir)
+        self.shard_size = shard_size
+        self.n_jobs = n_jobs
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.output_dir / self.manifest_name
+
+    def shards(self) -> list[Shard]:
+        """
+        Split the inputs into shards at line boundaries.
+        Returns:
+            list[Shard]: The shards of every input, in order.
+        """
+        shards = []
+        for input_index, path in enumerate(self.inputs):
+            offsets = self._line_offsets(path, self.shard_size)
+            for index, (start, end) in enumerate(zip(offsets, offsets[1:])):
+                name = f"part-{input_index:04d}-{index:05d}.txt"
+                shards.append(Shard(name, path, start, end))
+        return shards
+
+    @staticmethod
+    def _line_offsets(path: str, lines_per_shard: int) -> list[int]:
+        # the byte offsets of every lines_per_shard-th line start, found by counting newlines per block
+        offsets = [0]
+        position = 0
+        remaining = lines_per_shard
+        with open(path, "rb") as f:
+            while block := f.read(1 << 20):
+                count = block.count(b"\n")
+                if count < remaining:
+                    remaining -= count
+                else:
+                    index = -1
+                    for _ in range(count):
+                        index = block.index(b"\n", index + 1)
+                        remaining -= 1
+                        if remaining == 0:
+                            offsets.append(position + index + 1)
+                            remaining = lines_per_shard
+                position += len(block)
+        if offsets[-1] < position:
+            offsets.append(position)
+        return offsets
+
+    def _input_states(self) -> dict:
+        states = {}
+        for path in self.inputs:
+            stat = os.stat(path)
+            states[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return states
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != self.manifest_version:
+            return {}
+        return manifest
+
+    def run(self) -> dict:
+        """
+        Process every shard that has no valid output yet.
+        Returns:
+            dict: The number of processed, skipped and invalidated shards.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fingerprint = self.pipeline.fingerprint()
+        inputs = self._input_states()
+        shards = self.shards()
+
+        completed = self._load_manifest().get("shards", {})
+        valid = {}
+        invalidated = 0
+        for shard in shards:
+            entry = completed.pop(shard.name, None)
+            if entry is None:
+                continue
+            if (
+                entry["pipeline"] == fingerprint
+                and entry["input"] == shard.input
+                and entry["input_state"] == inputs[shard.input]
+                and (entry["start"], entry["end"]) == (shard.start, shard.end)
+                and (self.output_dir / shard.name).exists()
+            ):
+                valid[shard.name] = entry
+            else:
+                invalidated += 1
+                (self.output_dir / shard.name).unlink(missing_ok=True)
+        # shards that no longer exist, e.g. after a change of shard_size
+        for name in completed:
+            invalidated += 1
+            (self.output_dir / name).unlink(missing_ok=True)
+
+        manifest = {"version": self.manifest_version, "shards": valid}
+        _atomic_write_json(manifest, self.manifest_path)
+
+        pending = [shard for shard in shards if shard.name not in valid]
+        for shard, n_lines in self._process(pending):
+            valid[shard.name] = {
+                "pipeline": fingerprint,
+                "input": shard.input,
+                "input_state": inputs[shard.input],
+                "start": shard.start,
+                "end": shard.end,
+                "lines": n_lines,
+            }
+            _atomic_write_json(manifest, self.manifest_path)
+
+        return {
+            "processed": len(pending),
+            "skipped": len(shards) - len(pending),
+            "invalidated": invalidated,
+        }
+
+    def _process(self, shards: list[Shard]):
+        output_paths = [str(self.output_dir / shard.name) for shard in shards]
+        if self.n_jobs <= 1:
+            _init_worker(self.pipeline)
+            for shard, output_path in zip(shards, output_paths):
+                yield shard, _process_shard(shard, output_path)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            initializer=_init_worker,
+            initargs=(self.pipeline,),
+        ) as executor:
+            # completed shards are recorded as soon as they finish, whatever their order
+            futures = {
+                executor.submit(_process_shard, shard, output_path): shard
+                for shard, output_path in zip(shards, output_paths)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def outputs(self) -> list[Path]:
+        """
+        Get the output shards in the order of the inputs.
+        Returns:
+            list[Path]: The paths of the output shards.
+        """
+        return [self.output_dir / shard.name for shard in self.shards()]
@@ -0,0 +1,203 @@
+from typing import Iterable, NamedTuple
+from shekar import utils
+
+
+class VerbForm(NamedTuple):
+    lemma: str
+    tense: str
+    person: str | None
+    negative: bool
+
+
+_persons = ["1s", "2s", "3s", "1p", "2p", "3p"]
+_past_endings = ["م", "ی", "", "یم", "ید", "ند"]
+_present_endings = ["م", "ی", "د", "یم", "ید", "ند"]
+_perfect_endings = ["ام", "ای", "است", "ایم", "اید", "اند"]
+_continuous_prefixes = ["می‌", "می"]  # with and without ZWNJ
+_unprefixed_present_stems = {"دار", "خواه"}  # دارم، خواهم
+
+
+def _join_prefix(prefix: str, stem: str) -> str:
+    # ب and ن take a glide before stems starting with a vowel: بیاور، نینداخت
+    if stem.startswith("آ"):
+        return prefix + "یا" + stem[1:]
+    if stem.startswith("ا"):
+        return prefix + "ی" + stem[1:]
+    return prefix + stem
+
+
+def conjugate(past_stem: str, present_stem: str) -> Iterable[tuple[str, VerbForm]]:
+    """
+    Generate the single-token conjugated forms of a verb.
+    Args:
+        past_stem (str): The past stem of the verb, e.g. "رفت".
+        present_stem (str): The present stem of the verb, e.g. "رو".
+    Returns:
+        Iterable[tuple[str, VerbForm]]: The surface forms and their analyses.
+    """
+    lemma = past_stem + "#" + present_stem
+
+    yield past_stem + "ن", VerbForm(lemma, "infinitive", None, False)
+    yield _join_prefix("ن", past_stem) + "ن", VerbForm(lemma, "infinitive", None, True)
+    yield past_stem + "ه", VerbForm(lemma, "past_participle", None, False)
+    yield (
+        _join_prefix("ن", past_stem) + "ه",
+        VerbForm(lemma, "past_participle", None, True),
+    )
+
+    # vowel-final stems take a glide before the endings: گشایم، آیم
+    # after و it depends on the verb (گویم but روم), so both forms are generated
+    if present_stem.endswith(("ا", "آ")):
+        present_stems = [present_stem + "ی", present_stem]
+    elif present_stem.endswith("و"):
+        present_stems = [present_stem, present_stem + "ی"]
+    else:
+        present_stems = [present_stem]
+
+    for person, past_ending, perfect_ending in zip(
+        _persons, _past_endings, _perfect_endings
+    ):
+        yield past_stem + past_ending, VerbForm(lemma, "past", person, False)
+        yield (
+            _join_prefix("ن", past_stem) + past_ending,
+            VerbForm(lemma, "past", person, True),
+        )
+        for prefix in _continuous_prefixes:
+            yield (
+                prefix + past_stem + past_ending,
+                VerbForm(lemma, "past_continuous", person, False),
+            )
+            yield (
+                "ن" + prefix + past_stem + past_ending,
+                VerbForm(lemma, "past_continuous", person, True),
+            )
+        yield (
+            past_stem + "ه‌" + perfect_ending,
+            VerbForm(lemma, "present_perfect", person, False),
+        )
+        yield (
+            _join_prefix("ن", past_stem) + "ه‌" + perfect_ending,
+            VerbForm(lemma, "present_perfect", person, True),
+        )
+
+    for stem in present_stems:
+        for person, ending in zip(_persons, _present_endings):
+            for prefix in _continuous_prefixes:
+                yield prefix + stem + ending, VerbForm(lemma, "present", person, False)
+                yield (
+                    "ن" + prefix + stem + ending,
+                    VerbForm(lemma, "present", person, True),
+                )
+            if present_stem in _unprefixed_present_stems:
+                yield stem + ending, VerbForm(lemma, "present", person, False)
+            yield (
+                _join_prefix("ب", stem) + ending,
+                VerbForm(lemma, "subjunctive", person, False),
+            )
+            yield (
+                _join_prefix("ن", stem) + ending,
+                VerbForm(lemma, "subjunctive", person, True),
+            )
+
+    yield _join_prefix("ب", present_stem), VerbForm(lemma, "imperative", "2s", False)
+    yield _join_prefix("ن", present_stem), VerbForm(lemma, "imperative", "2s", True)
+
+
+_conjugation_index = None
+
+
+def _get_conjugation_index() -> dict[str, VerbForm]:
+    global _conjugation_index
+    if _conjugation_index is None:
+        index = {}
+        for present_stem, past_stem in utils.verbs.iter_rows():
+            for surface, form in conjugate(past_stem, present_stem):
+                # the first analysis of an ambiguous form wins
+                index.setdefault(surface, form)
+        _conjugation_index = index
+    return _conjugation_index
+
+
+def _default_vocabulary():
+    from shekar.lexicons import load_lexicon
+
+    try:
+        return load_lexicon("vocab")
+    except OSError:  # the vocabulary lexicon is not installed
+        return frozenset()
+
+
+class Lemmatizer:
+    """
+    Lemmatizes Persian verbs using a precomputed index of their conjugated forms.
+    Every verb of the verbs lexicon is expanded once per process into its single-token forms
+    (with the می، نمی، ب and ن prefixes, person endings, participles and ZWNJ variants),
+    so a lookup is a single dictionary probe. Lemmas are written as "past#present", e.g. "رفت#رو".
+    Words of the vocabulary are never analyzed as verb forms, so nouns such as "نمک", which is also
+    the negative imperative of مکیدن, are returned unchanged.
+    Example:
+        >>> lemmatizer = Lemmatizer()
+        >>> lemmatizer.lemmatize("نمی‌روم")
+        'رفت#رو'
+        >>> lemmatizer.lemmatize("کتاب")
+        'کتاب'
+    """
+
+    def __init__(self, vocabulary: Iterable[str] = None):
+        """
+        Args:
+            vocabulary (Iterable[str], optional): Words that are returned unchanged even if they look like a
+                verb form. Defaults to the vocab lexicon when it is installed.
+        """
+        if vocabulary is None:
+            vocabulary = _default_vocabulary()
+        elif not isinstance(vocabulary, (set, frozenset)):
+            vocabulary = set(vocabulary)
+        # the vocabulary is applied once to the index, so a lookup stays a single probe
+        self._index = {
+            surface: form
+            for surface, form in _get_conjugation_index().items()
+            if surface not in vocabulary
+        }
+        self._lemmas = {surface: form.lemma for surface, form in self._index.items()}
+
+    def lemmatize(self, token: str) -> str:
+        """
+        Get the lemma of a token.
+        Args:
+            token (str): The token to lemmatize.
+        Returns:
+            str: The lemma of the token if it is a known verb form, otherwise the token itself.
+        """
+        return self._lemmas.get(token, token)
+
+    def lemmatize_batch(self, tokens: Iterable[str]) -> list[str]:
+        """
+        Get the lemmas of a batch of tokens.
+        Args:
+            tokens (Iterable[str]): The tokens to lemmatize.
+        Returns:
+            list[str]: The lemma of each token.
+        """
+        lemmas = self._lemmas
+        return [lemmas.get(token, token) for token in tokens]
+
+    def analyze(self, token: str) -> VerbForm | None:
+        """
+        Get the morphological analysis of a verb form.
+        Args:
+            token (str): The token to analyze.
+        Returns:
+            VerbForm: The lemma, tense, person and polarity of the token, or None if it is not a known verb form.
+        """
+        return self._index.get(token)
+
+    def is_verb(self, token: str) -> bool:
+        """
+        Check whether a token is a known verb form.
+        Args:
+            token (str): The token to check.
+        Returns:
+            bool: True if the token is a conjugated form of a known verb.
+        """
+        return token in self._index
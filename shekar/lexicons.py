@@ -0,0 +1,292 @@
+import hashlib
+import json
+import mmap
+import struct
+from pathlib import Path
+
+from shekar.utils import data_root_path
+
+# name -> (source csv, column holding the words if the table is also a membership set)
+lexicon_sources = {
+    "vocab": ("vocab.csv", "word"),
+    "verbs": ("verbs.csv", None),
+    "stopwords": ("stopwords.csv", "word"),
+}
+
+_lexicon_magic = b"SHKLEX01"
+_header = struct.Struct("<8sI")
+
+
+class SortedLexicon:
+    """
+    A read-only set of words stored as a memory-mapped sorted array.
+    The file holds a header, the offsets of the words and the UTF-8 encoded words
+    sorted by their bytes, so membership is a binary search over the mapping.
+    Example:
+        >>> stopwords = load_lexicon("stopwords")
+        >>> "است" in stopwords
+        True
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._size = _header.unpack_from(self._buffer, 0)
+        if magic != _lexicon_magic:
+            raise ValueError(f"{self.path} is not a compiled lexicon.")
+        self._offsets = struct.unpack_from(
+            f"<{self._size + 1}I", self._buffer, _header.size
+        )
+        self._data_start = _header.size + 4 * (self._size + 1)
+
+    def __reduce__(self):
+        # the mapping is reopened from the file, e.g. in worker processes
+        return SortedLexicon, (self.path,)
+
+    def _word(self, i: int) -> bytes:
+        start = self._data_start + self._offsets[i]
+        end = self._data_start + self._offsets[i + 1]
+        return self._buffer[start:end]
+
+    def __contains__(self, word: str) -> bool:
+        key = word.encode("utf-8")
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._word(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._size and self._word(low) == key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._word(i).decode("utf-8")
+
+    @staticmethod
+    def write(words, path: Path):
+        """
+        Write a compiled lexicon.
+        Args:
+            words (Iterable[str]): The words of the lexicon.
+            path (Path): The destination path.
+        """
+        encoded = sorted({word.encode("utf-8") for word in words})
+        offsets = [0]
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+        with open(path, "wb") as f:
+            f.write(_header.pack(_lexicon_magic, len(encoded)))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(b"".join(encoded))
+
+
+def file_checksum(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _file_record(path: Path, prefix: str = "") -> dict:
+    stat = Path(path).stat()
+    return {
+        prefix + "sha256": file_checksum(path),
+        prefix + "size": stat.st_size,
+        prefix + "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _file_matches(path: Path, record: dict, prefix: str = "") -> bool:
+    # an unchanged size and modification time skip the checksum, which is only
+    # computed when the file was touched, e.g. after a checkout or an edit
+    stat = path.stat()
+    if (
+        record.get(prefix + "size") == stat.st_size
+        and record.get(prefix + "mtime_ns") == stat.st_mtime_ns
+    ):
+        return True
+    return file_checksum(path) == record[prefix + "sha256"]
+
+
+def build(data_dir: Path = data_root_path) -> dict:
+    """
+    Compile the CSV lexicons of a data directory into binary artifacts and write its manifest.
+    Tables are written as Parquet and word lists as sorted arrays, and the manifest records
+    the checksums, sizes and modification times of every source and artifact. Sources that are missing are skipped.
+    The emoji table is generated from the emoji package when it is installed.
+    Run it with `python -m shekar.lexicons` after editing a CSV file.
+    Args:
+        data_dir (Path, optional): The data directory. Defaults to the package data directory.
+    Returns:
+        dict: The manifest.
+    """
+    import polars as pl
+
+    data_dir = Path(data_dir)
+    manifest = {}
+    for name, (source, word_column) in lexicon_sources.items():
+        source_path = data_dir / source
+        if not source_path.exists():
+            continue
+
+        table = pl.read_csv(source_path)
+        artifacts = {"table": name + ".parquet"}
+        table.write_parquet(data_dir / artifacts["table"], statistics=False)
+        if word_column is not None:
+            artifacts["lexicon"] = name + ".lex"
+            SortedLexicon.write(
+                table[word_column].to_list(), data_dir / artifacts["lexicon"]
+            )
+
+        manifest[name] = {
+            "source": source,
+            **_file_record(source_path, "source_"),
+            "artifacts": {
+                kind: {"path": path, **_file_record(data_dir / path)}
+                for kind, path in artifacts.items()
+            },
+        }
+
+    try:
+        import emoji
+    except ImportError:
+        emoji = None
+    if emoji is not None:
+        write_emoji_table(data_dir / "emoji.tsv")
+        manifest["emoji"] = {
+            "source": None,  # generated from the emoji package
+            "source_version": emoji.__version__,
+            "artifacts": {
+                "table": {"path": "emoji.tsv", **_file_record(data_dir / "emoji.tsv")}
+            },
+        }
+
+    with open(data_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+def _load_manifest(data_dir: Path) -> dict:
+    try:
+        with open(data_dir / "manifest.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _artifact_path(name: str, kind: str, data_dir: Path):
+    """
+    Returns the path of a compiled artifact if it exists and its checksums are valid, otherwise None.
+    Files whose size and modification time match the manifest are trusted without hashing them.
+    """
+    entry = _load_manifest(data_dir).get(name)
+    if entry is None or kind not in entry["artifacts"]:
+        return None
+
+    artifact = entry["artifacts"][kind]
+    artifact_path = data_dir / artifact["path"]
+    source_path = data_dir / entry["source"] if entry["source"] is not None else None
+    if not artifact_path.exists():
+        return None
+    if (
+        source_path is not None
+        and source_path.exists()
+        and not _file_matches(source_path, entry, "source_")
+    ):
+        return None  # the source was edited after the build
+    if not _file_matches(artifact_path, artifact):
+        return None
+    return artifact_path
+
+
+def load_table(name: str, data_dir: Path = data_root_path):
+    """
+    Load a lexicon as a polars table, from its Parquet artifact when it is valid.
+    Args:
+        name (str): The name of the lexicon, e.g. "verbs".
+        data_dir (Path, optional): The data directory. Defaults to the package data directory.
+    Returns:
+        polars.DataFrame: The lexicon table.
+    """
+    import polars as pl
+
+    data_dir = Path(data_dir)
+    artifact_path = _artifact_path(name, "table", data_dir)
+    if artifact_path is not None:
+        return pl.read_parquet(artifact_path)
+    return pl.read_csv(data_dir / lexicon_sources[name][0])
+
+
+def load_lexicon(name: str, data_dir: Path = data_root_path):
+    """
+    Load a lexicon as a set of words, memory-mapping its compiled artifact when it is valid.
+    Args:
+        name (str): The name of the lexicon, e.g. "stopwords".
+        data_dir (Path, optional): The data directory. Defaults to the package data directory.
+    Returns:
+        SortedLexicon | set[str]: The words of the lexicon.
+    """
+    data_dir = Path(data_dir)
+    artifact_path = _artifact_path(name, "lexicon", data_dir)
+    if artifact_path is not None:
+        return SortedLexicon(artifact_path)
+    return set(load_table(name, data_dir)[lexicon_sources[name][1]].to_list())
+
+
+def write_emoji_table(path: Path) -> int:
+    """
+    Write the emoji sequences of the emoji package, one "sequence<TAB>component" pair per line,
+    where component is 1 for the components such as skin tones that combine with other emojis.
+    Args:
+        path (Path): The destination path.
+    Returns:
+        int: The number of sequences written.
+    """
+    from emoji import unicode_codes
+
+    component = unicode_codes.STATUS["component"]
+    sequences = sorted(unicode_codes.EMOJI_DATA.items())
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for sequence, data in sequences:
+            f.write(f"{sequence}\t{int(data['status'] == component)}\n")
+    return len(sequences)
+
+
+def load_emoji_table(data_dir: Path = data_root_path) -> dict[str, bool]:
+    """
+    Load the emoji table, from its artifact when it is valid and otherwise from the emoji package.
+    Args:
+        data_dir (Path, optional): The data directory. Defaults to the package data directory.
+    Returns:
+        dict[str, bool]: Every emoji sequence, mapped to whether it is a component.
+    Raises:
+        ImportError: If the artifact is missing and the emoji package is not installed.
+    """
+    artifact_path = _artifact_path("emoji", "table", Path(data_dir))
+    if artifact_path is not None:
+        table = {}
+        with open(artifact_path, encoding="utf-8", newline="\n") as f:
+            for line in f:
+                sequence, _, component = line.rstrip("\n").rpartition("\t")
+                table[sequence] = component == "1"
+        return table
+
+    try:
+        from emoji import unicode_codes
+    except ImportError as e:
+        raise ImportError(
+            "The emoji table is missing, install the emoji package to rebuild it."
+        ) from e
+    component = unicode_codes.STATUS["component"]
+    return {
+        sequence: data["status"] == component
+        for sequence, data in unicode_codes.EMOJI_DATA.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, entry in build().items():
+        print(f"{name}: {', '.join(a['path'] for a in entry['artifacts'].values())}")
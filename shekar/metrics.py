@@ -0,0 +1,345 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Iterable
+
+# upper bounds in seconds, from 10 microseconds to 1 minute
+default_latency_buckets = (
+    1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0,
+)  # fmt: skip
+
+
+class _Metric(ABC):
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}  # label values -> child
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    @abstractmethod
+    def _new_child(self):
+        pass
+
+    def labels(self, *values) -> "_Metric":
+        """
+        Get the child of the metric for the given label values.
+        Args:
+            values (str): One value per label name, in order.
+        Returns:
+            The child metric, with the same methods as an unlabeled metric.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects the labels {self.labelnames}, got {values}."
+            )
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> list[tuple[dict, object]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [
+            (dict(zip(self.labelnames, values)), child._value())
+            for values, child in children
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._children = {}
+            if not self.labelnames:
+                self._children[()] = self._new_child()
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def _value(self):
+        return self.value
+
+
+class _GaugeChild(_CounterChild):
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def _value(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count, such as the number of processed tokens.
+    """
+
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down, such as the size of a loaded vocabulary.
+    """
+
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._children[()].dec(amount)
+
+
+class Histogram(_Metric):
+    """
+    The distribution of observed values, such as latencies, counted in cumulative buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = default_latency_buckets,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+
+class MetricsRegistry:
+    """
+    A registry of counters, gauges and histograms that shekar's hot paths report into.
+    Reporting is opt-in: instrumented code checks the enabled attribute before doing any work, so a
+    disabled registry costs a single attribute check per call. Updates are thread-safe, and every
+    process has its own registry.
+    Example:
+        >>> from shekar.metrics import registry
+        >>> registry.enabled = True
+        >>> tokens = WordTokenizer.tokenize("سلام دنیا")
+        >>> registry.snapshot()["shekar_tokenizer_tokens_total"]["values"]
+        [{'labels': {}, 'value': 2}]
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Args:
+            enabled (bool, optional): Whether instrumented code reports metrics. Defaults to False.
+        """
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.type}.")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        """
+        Get or create a counter.
+        Args:
+            name (str): The name of the metric, in Prometheus style, e.g. "shekar_tokens_total".
+            help (str): A description of the metric.
+            labelnames (Iterable[str], optional): The names of the labels of the metric. Defaults to ().
+        Returns:
+            Counter: The counter.
+        """
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """
+        Get or create a gauge. See MetricsRegistry.counter.
+        """
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = default_latency_buckets,
+    ) -> Histogram:
+        """
+        Get or create a histogram. See MetricsRegistry.counter.
+        Args:
+            buckets (Iterable[float], optional): The upper bounds of the buckets. Defaults to latency buckets in seconds.
+        """
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def reset(self):
+        """
+        Reset every metric to its initial value.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> dict:
+        """
+        Get the current value of every metric.
+        Returns:
+            dict: For every metric name, its type, help and the values of each label combination.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {
+            name: {
+                "type": metric.type,
+                "help": metric.help,
+                "values": [
+                    {"labels": labels, "value": value}
+                    for labels, value in metric._samples()
+                ],
+            }
+            for name, metric in metrics
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Export every metric in the Prometheus text exposition format.
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        lines = []
+        for name, metric in self.snapshot().items():
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for sample in metric["values"]:
+                labels, value = sample["labels"], sample["value"]
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format(value)}")
+                    continue
+                for bound, count in value["buckets"]:
+                    bucket_labels = {**labels, "le": _format(bound)}
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} {count}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format(value['sum'])}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Serve the metrics at /metrics over HTTP from a daemon thread, for a local Prometheus to scrape.
+        Args:
+            port (int, optional): The port to listen on, 0 for any free port. Defaults to 9464.
+            host (str, optional): The address to listen on. Defaults to "127.0.0.1".
+        Returns:
+            http.server.ThreadingHTTPServer: The running server, which can be stopped with shutdown().
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# the registry of the library, enabled by setting SHEKAR_METRICS=1 or registry.enabled = True
+registry = MetricsRegistry(enabled=os.environ.get("SHEKAR_METRICS", "") == "1")
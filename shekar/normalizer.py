@@ -1,5 +1,10 @@
-from typing import Iterable
-from shekar import Pipeline
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, Iterator
+import re
+import warnings
+from shekar import utils
+from shekar.pipeline import Pipeline
 from shekar.preprocessing import (
     PunctuationNormalizer,
     AlphabetNormalizer,
@@ -15,6 +20,168 @@ from shekar.preprocessing import (
     ArabicUnicodeNormalizer,
 )
 
+# The default steps never rewrite text across a line break that sits between two words made of
+# Persian letters, the first one possibly ending with sentence punctuation, or across a space after
+# such punctuation, unless an HTML tag may be open there. Documents are split at such breaks.
+_line_local_steps = (
+    PunctuationNormalizer,
+    AlphabetNormalizer,
+    NumericNormalizer,
+    SpacingStandardizer,
+    EmojiRemover,
+    EmailMasker,
+    URLMasker,
+    DiacriticsRemover,
+    NonPersianRemover,
+    HTMLTagRemover,
+    RedundantCharacterRemover,
+    ArabicUnicodeNormalizer,
+)
+_persian_letters = frozenset(utils.persian_letters)
+_sentence_punctuation = frozenset(utils.punctuation_singles)
+_word_characters = _persian_letters | {"\u200c"}
+_break_scanner = re.compile(
+    r"[<‹＜&>\n]|(?<=[" + re.escape(utils.punctuation_singles) + r"]) "
+)
+_max_word_length = 64
+_max_unsplit_chunks = 8
+_max_unsplit_size = 1 << 16
+
+
+def _is_safe_break(text: str, i: int) -> bool:
+    if i == 0 or i + 1 >= len(text) or text[i + 1] not in _persian_letters:
+        return False
+    # the word before the break must be Persian letters, joined by ZWNJs, followed by sentence
+    # punctuation such as "." or "؟", which the steps only map one character at a time, so no mask
+    # or tag can remove its end
+    j = i - 1
+    while j >= 0 and text[j] in _sentence_punctuation:
+        j -= 1
+        if i - j > _max_word_length:
+            return False
+    if text[i] == " " and j == i - 1:
+        # steps such as the ezafe rule of SpacingStandardizer join words across a bare space
+        return False
+    if j < 0 or text[j] not in _persian_letters:
+        return False
+    while j >= 0 and text[j] in _word_characters:
+        j -= 1
+        if i - j > _max_word_length:
+            return False
+    return text[j + 1] in _persian_letters and (j < 0 or text[j].isspace())
+
+
+def _closes_tags(text: str, i: int) -> bool:
+    # a ">" inside a URL-like token may be masked before HTMLTagRemover runs
+    start = i
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+        if i - start > 2048:
+            return False
+    end = i
+    while end + 1 < len(text) and not text[end + 1].isspace():
+        end += 1
+        if end - i > 2048:
+            return False
+    token = text[start : end + 1]
+    return "/" not in token and "÷" not in token
+
+
+def _safe_breaks(text: str) -> tuple[list[int], bool]:
+    """
+    Find the line breaks and spaces at which the normalization of a text can be split.
+    Returns:
+        tuple[list[int], bool]: The positions of the breaks, and whether an HTML tag may still be open at the end.
+    """
+    breaks = []
+    tag_open = False
+    for match in _break_scanner.finditer(text):
+        character, i = match.group(), match.start()
+        if character in "\n ":
+            if not tag_open and _is_safe_break(text, i):
+                breaks.append(i)
+        elif character == ">":
+            if tag_open and _closes_tags(text, i):
+                tag_open = False
+        else:  # "<", or a character normalized or unescaped into "<"
+            tag_open = True
+    return breaks, tag_open
+
+
+def _split_at(text: str, breaks: list[int]) -> tuple[list[str], list[str]]:
+    # the blocks between the breaks, and the break characters that separate them
+    starts = [0] + [i + 1 for i in breaks]
+    ends = breaks + [len(text)]
+    return [text[start:end] for start, end in zip(starts, ends)], [
+        text[i] for i in breaks
+    ]
+
+
+def _join(parts: list[str], separators: list[str]) -> str:
+    return "".join(
+        part + separator for part, separator in zip(parts, separators + [""])
+    )
+
+
+def _warn_unsplit(buffer: str, chunk_size: int) -> bool:
+    # text without safe breaks is held and normalized as one chunk, outside the memory bound
+    if len(buffer) <= max(_max_unsplit_chunks * chunk_size, _max_unsplit_size):
+        return False
+    warnings.warn(
+        f"No safe break in {len(buffer)} characters of the document, which are held in memory "
+        "and normalized as one chunk. Only line breaks and spaces after sentence punctuation "
+        "between Persian words are safe.",
+        RuntimeWarning,
+        stacklevel=5,
+    )
+    return True
+
+
+def _document_blocks(source, chunk_size: int) -> Iterator[tuple[str, str, str]]:
+    # blocks of at least chunk_size characters cut at the last safe break, with the separators
+    # before and after them, "" at the ends of the document
+    if isinstance(source, str):
+        reads = (source[i : i + chunk_size] for i in range(0, len(source), chunk_size))
+    else:
+        reads = iter(lambda: source.read(chunk_size), "")
+
+    buffer = ""
+    before = ""
+    scan_size = chunk_size
+    warned = False
+    for piece in reads:
+        buffer += piece
+        if len(buffer) < scan_size:
+            continue
+        breaks = _safe_breaks(buffer)[0]
+        if not breaks:
+            # the buffer is scanned again only once it has doubled
+            scan_size = 2 * len(buffer)
+            warned = warned or _warn_unsplit(buffer, chunk_size)
+            continue
+        scan_size = chunk_size
+        # a break is never the last character, so another block always follows
+        cut = breaks[-1]
+        yield buffer[:cut], before, buffer[cut]
+        before, buffer = buffer[cut], buffer[cut + 1 :]
+    if not warned:
+        _warn_unsplit(buffer, chunk_size)
+    yield buffer, before, ""
+
+
+def _normalize_block(
+    normalizer: "Normalizer", block: str, before: str, after: str
+) -> str:
+    # the neighbouring breaks are kept as context, the final strip of SpacingStandardizer removes them
+    return normalizer.normalize(before + block + after)
+
+
+def _normalize_separated_block(
+    normalizer: "Normalizer", block: tuple[str, str, str]
+) -> str:
+    # followed by its separator, so the outputs concatenate into the normalized document
+    return _normalize_block(normalizer, *block) + block[2]
+
 
 class Normalizer:
     def __init__(self, pipline: Pipeline = None):
@@ -40,3 +207,199 @@ class Normalizer:
 
     def normalize(self, text: Iterable[str] | str):
         return self._pipeline(text)
+
+    def normalize_corpus(self, texts: Iterable[str], cache_size: int = 2**16):
+        """
+        Normalize a large corpus, normalizing each distinct token once. See Pipeline.transform_corpus.
+        Args:
+            texts (Iterable[str]): The texts.
+            cache_size (int, optional): The maximum number of memoized tokens per group of steps. Defaults to 65536.
+        Returns:
+            Iterator[str]: The normalized texts, identical to the output of normalize.
+        """
+        return self._pipeline.transform_corpus(texts, cache_size=cache_size)
+
+    def save(self, path):
+        """
+        Save a snapshot of the normalizer pipeline. See Pipeline.save.
+        Args:
+            path (str | Path): The destination path.
+        """
+        self._pipeline.save(path)
+
+    @classmethod
+    def load(cls, path) -> "Normalizer":
+        """
+        Load a normalizer from a snapshot saved with Normalizer.save.
+        Args:
+            path (str | Path): The snapshot path.
+        Returns:
+            Normalizer: The restored normalizer.
+        """
+        return cls(pipline=Pipeline.load(path))
+
+    def incremental(self, text: str = "") -> "IncrementalNormalizer":
+        """
+        Create an incremental normalizer for a document that is edited over time.
+        Args:
+            text (str, optional): The initial document. Defaults to "".
+        Returns:
+            IncrementalNormalizer: The incremental normalizer.
+        """
+        return IncrementalNormalizer(self, text)
+
+    def normalize_document(
+        self, source, n_jobs: int = 1, chunk_size: int = 1 << 20
+    ) -> Iterator[str]:
+        """
+        Normalize a single large document in chunks, optionally in parallel.
+        The document is cut at line breaks and spaces where no normalization step can see across,
+        as in IncrementalNormalizer, into chunks of at least chunk_size characters. The chunks are
+        normalized independently and their outputs joined with the breaks, which is identical to
+        normalizing the whole document, while only a few chunks per worker are held in memory.
+        Breaks are only safe between Persian words, so text without them, such as an English log
+        or a long paragraph without punctuation, is held in memory and normalized sequentially as
+        one chunk. A RuntimeWarning is raised once such a chunk exceeds both 8 times chunk_size
+        and 65536 characters.
+        Pipelines with steps other than the built-in ones are normalized as a single chunk.
+        Args:
+            source (str | TextIO): The document, as a string or a text file object.
+            n_jobs (int, optional): The number of worker processes, 1 to normalize in the calling process. Defaults to 1.
+            chunk_size (int, optional): The minimum number of characters per chunk. Defaults to 1 << 20.
+        Returns:
+            Iterator[str]: Pieces of the normalized document, to be concatenated.
+        Example:
+            >>> with open("book.txt", encoding="utf-8") as f, open("out.txt", "w", encoding="utf-8") as out:
+            ...     out.writelines(Normalizer().normalize_document(f, n_jobs=8))
+        """
+        splittable = all(
+            type(step) in _line_local_steps for name, step in self._pipeline.steps
+        )
+        if not splittable:
+            yield self.normalize(source if isinstance(source, str) else source.read())
+            return
+
+        blocks = _document_blocks(source, chunk_size)
+        yield from utils.parallel_map(_normalize_separated_block, blocks, self, n_jobs)
+
+
+class IncrementalNormalizer:
+    """
+    Keeps the normalization of an edited document up to date by re-normalizing only the edited region.
+    The document is split into blocks at line breaks where no normalization step can see across,
+    that is between two words of Persian letters, the first one possibly followed by sentence
+    punctuation, and at spaces after such punctuation, outside of any HTML tag. An edit re-normalizes
+    the blocks it touches and their neighbours, so its cost depends on the edit and not on the document.
+    The output is always equal to normalizing the whole document. Pipelines with steps other than
+    the built-in ones are kept as a single block.
+    Example:
+        >>> document = Normalizer().incremental("سلام\\nدنیا")
+        >>> document.edit(4, 0, " ما")
+        'سلام ما\\nدنیا'
+    """
+
+    def __init__(self, normalizer: Normalizer = None, text: str = ""):
+        self.normalizer = normalizer or Normalizer()
+        self._splittable = all(
+            type(step) in _line_local_steps
+            for name, step in self.normalizer._pipeline.steps
+        )
+        self.reset(text)
+
+    def reset(self, text: str):
+        """
+        Replace the document and normalize it from scratch.
+        Args:
+            text (str): The new document.
+        """
+        if self._splittable:
+            self._blocks, self._separators = _split_at(text, _safe_breaks(text)[0])
+        else:
+            self._blocks, self._separators = [text], []
+        self._outputs = [
+            self._normalize_block(block, *self._context(k))
+            for k, block in enumerate(self._blocks)
+        ]
+        self._output = None
+
+    @property
+    def text(self) -> str:
+        return _join(self._blocks, self._separators)
+
+    @property
+    def output(self) -> str:
+        if self._output is None:
+            self._output = _join(self._outputs, self._separators)
+        return self._output
+
+    def _context(self, k: int) -> tuple[str, str]:
+        # the separators around block k, "" at the ends of the document
+        before = self._separators[k - 1] if k > 0 else ""
+        after = self._separators[k] if k < len(self._separators) else ""
+        return before, after
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> str:
+        """
+        Apply an edit to the document.
+        Args:
+            offset (int): The position of the edit in the current document.
+            deleted (int): The number of characters deleted at the offset.
+            inserted (str): The text inserted at the offset.
+        Returns:
+            str: The normalized document.
+        """
+        if not self._splittable:
+            text = self._blocks[0]
+            self.reset(text[:offset] + inserted + text[offset + deleted :])
+            return self.output
+
+        # block k spans [starts[k], next_starts[k] - 1), followed by a break
+        next_starts = list(accumulate(len(block) + 1 for block in self._blocks))
+        if not 0 <= offset <= offset + deleted <= next_starts[-1] - 1:
+            raise ValueError("The edit is out of the bounds of the document.")
+
+        last = len(self._blocks) - 1
+        first_block = max(0, bisect_right(next_starts, offset) - 1)
+        last_block = min(last, bisect_right(next_starts, offset + deleted) + 1)
+        region_start = next_starts[first_block - 1] if first_block > 0 else 0
+        region = _join(
+            self._blocks[first_block : last_block + 1],
+            self._separators[first_block:last_block],
+        )
+        region = (
+            region[: offset - region_start]
+            + inserted
+            + region[offset + deleted - region_start :]
+        )
+
+        breaks, tag_open = _safe_breaks(region)
+        while tag_open and last_block < last:
+            # an opened tag may reach into the following blocks, so they are merged until it closes
+            last_block += 1
+            region += self._separators[last_block - 1] + self._blocks[last_block]
+            breaks, tag_open = _safe_breaks(region)
+
+        previous = {
+            (self._blocks[k], *self._context(k)): self._outputs[k]
+            for k in range(first_block, last_block + 1)
+        }
+        blocks, separators = _split_at(region, breaks)
+        # the new blocks are surrounded by the separators around the region
+        context = [self._context(first_block)[0], *separators]
+        context.append(self._context(last_block)[1])
+        outputs = []
+        for i, block in enumerate(blocks):
+            key = (block, context[i], context[i + 1])
+            output = previous.get(key)
+            if output is None:
+                output = self._normalize_block(*key)
+            outputs.append(output)
+
+        self._blocks[first_block : last_block + 1] = blocks
+        self._separators[first_block:last_block] = separators
+        self._outputs[first_block : last_block + 1] = outputs
+        self._output = None
+        return self.output
+
+    def _normalize_block(self, block: str, before: str, after: str) -> str:
+        return _normalize_block(self.normalizer, block, before, after)
@@ -1,7 +1,80 @@
+import functools
+import hashlib
+import importlib.util
+import pickle
+import re
+import sys
+from types import ModuleType
 from .base import BaseTransformer
+from .batch import TextBatch
+
+
+# ASCII whitespace only, since the steps that use the regex module and the stdlib re
+# disagree on whether control characters such as U+001C are whitespace
+_whitespace = re.compile(r"([ \t\n\r\f\v]+)")
+
+
+def _describe(value) -> str:
+    """
+    A canonical description of a step configuration, stable across processes.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(map(_describe, value)) + "]"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(map(_describe, value))) + "}"
+    if isinstance(value, dict):
+        items = sorted((_describe(k), _describe(v)) for k, v in value.items())
+        return "{" + ", ".join(f"{k}: {v}" for k, v in items) + "}"
+    if hasattr(value, "pattern") and hasattr(
+        value, "flags"
+    ):  # compiled re and regex patterns
+        return f"pattern({value.pattern!r}, {value.flags})"
+    if isinstance(value, (bytes, bytearray, memoryview)) or hasattr(value, "tobytes"):
+        data = value.tobytes() if hasattr(value, "tobytes") else bytes(value)
+        return "bytes(" + hashlib.sha256(data).hexdigest() + ")"
+    if isinstance(value, type) or callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', None)}.{value.__qualname__}"
+    if type(value).__name__ == "module":
+        return f"module({value.__name__})"
+    if hasattr(value, "__dict__"):
+        return f"{type(value).__module__}.{type(value).__qualname__}({_describe(vars(value))})"
+    if hasattr(value, "__iter__"):  # e.g. a memory-mapped lexicon
+        return f"{type(value).__qualname__}({_describe(sorted(map(_describe, value)))})"
+    return f"{type(value).__qualname__}({value!r})"
+
+
+def _package_dependencies(modules) -> set[str]:
+    """
+    The given modules and the modules of the package they import, transitively.
+    """
+    package = __name__.partition(".")[0]
+    found = set(modules)
+    pending = list(found)
+    while pending:
+        module = sys.modules.get(pending.pop())
+        if module is None:
+            continue
+        for value in list(vars(module).values()):
+            if isinstance(value, ModuleType):
+                name = value.__name__
+            else:
+                name = getattr(value, "__module__", None)
+            if (
+                isinstance(name, str)
+                and name.partition(".")[0] == package
+                and name not in found
+            ):
+                found.add(name)
+                pending.append(name)
+    return found
 
 
 class Pipeline(BaseTransformer):
+    snapshot_format_version = 1
+    _chunk_size = 1024
+
     def __init__(self, steps: list[tuple[str, BaseTransformer]]):
         self.steps = steps
 
@@ -13,25 +86,171 @@ class Pipeline(BaseTransformer):
     def transform(self, X):
         for name, step in self.steps:
             X = step.transform(X)
+            if X is None:  # dropped by a gate such as ScriptRatioGate
+                break
         return X
 
     def fit_transform(self, X, y=None):
-        if isinstance(X, str):
+        if isinstance(X, (str, TextBatch)):
             for name, step in self.steps:
                 X = step.fit_transform(X, y)
+                if X is None:
+                    break
             return X
         elif isinstance(X, list):
 
             def generator():  # to avoid making the outer function a generator
-                for text in X:
+                # the steps see chunks of texts, so that gates such as ScriptRatioGate
+                # score a whole chunk at once
+                for start in range(0, len(X), self._chunk_size):
+                    texts = X[start : start + self._chunk_size]
                     for name, step in self.steps:
-                        text = step.fit_transform(text, y)
-                    yield text
+                        texts = [
+                            text
+                            for text in step.fit_transform(texts, y)
+                            if text is not None
+                        ]
+                    yield from texts
 
             return generator()
 
         else:
-            raise ValueError("Input must be a string or a list of strings.")
+            raise ValueError(
+                "Input must be a string, a list of strings or a TextBatch."
+            )
 
     def __call__(self, X):
         return self.fit_transform(X)
+
+    def transform_corpus(
+        self, texts, cache_size: int = 2**16, keep_dropped: bool = False
+    ):
+        """
+        Transform a large corpus, running the token-local steps once per distinct token.
+        Consecutive steps declared token_local are applied to every whitespace-separated token
+        through a bounded memo, and the text is rebuilt around the original whitespace. Steps that
+        need context, such as SpacingStandardizer or URLMasker, run on the whole text.
+        The output is identical to transforming each text.
+        Args:
+            texts (Iterable[str]): The texts.
+            cache_size (int, optional): The maximum number of tokens memoized per group of steps. Defaults to 65536.
+            keep_dropped (bool, optional): Yield None for the texts dropped by a gate such as ScriptRatioGate,
+                so that the outputs stay aligned with the texts. Defaults to False.
+        Returns:
+            Iterator[str]: The transformed texts.
+        """
+        functions = []
+        token_steps = []
+        for name, step in self.steps + [(None, None)]:
+            if getattr(step, "token_local", False):
+                token_steps.append(step)
+                continue
+            if token_steps:
+                functions.append(self._token_function(token_steps, cache_size))
+                token_steps = []
+            if step is not None:
+                functions.append(step.transform)
+
+        for text in texts:
+            for function in functions:
+                text = function(text)
+                if text is None:
+                    break
+            if text is not None or keep_dropped:
+                yield text
+
+    @staticmethod
+    def _token_function(steps, cache_size: int):
+        @functools.lru_cache(maxsize=cache_size)
+        def transform_token(token):
+            for step in steps:
+                token = step._function(token)
+            return token
+
+        def transform_text(text):
+            parts = _whitespace.split(text)
+            parts[::2] = map(transform_token, parts[::2])
+            return "".join(parts)
+
+        return transform_text
+
+    def save(self, path):
+        """
+        Save a snapshot of the pipeline, including the tables and indexes built by its steps.
+        Loading a snapshot skips building them, but regular expressions are pickled as their
+        patterns and compiled again on load, so the saving over constructing the steps is modest.
+        Args:
+            path (str | Path): The destination path.
+        """
+        header = {
+            "format": self.snapshot_format_version,
+            "modules": self._source_fingerprints(self._step_modules()),
+        }
+        with open(path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path) -> "Pipeline":
+        """
+        Load a pipeline snapshot saved with Pipeline.save.
+        Args:
+            path (str | Path): The snapshot path.
+        Returns:
+            Pipeline: The restored pipeline.
+        Raises:
+            ValueError: If the snapshot was written by another snapshot format or by a different
+                version of the modules defining its steps.
+        """
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("format") != cls.snapshot_format_version:
+                raise ValueError(f"Unsupported pipeline snapshot format in {path}.")
+            if cls._source_fingerprints(header["modules"]) != header["modules"]:
+                raise ValueError(
+                    f"Pipeline snapshot {path} is stale, the step definitions have changed."
+                )
+            pipeline = pickle.load(f)
+
+        if not isinstance(pipeline, cls):
+            raise ValueError(f"{path} is not a {cls.__name__} snapshot.")
+        return pipeline
+
+    def fingerprint(self) -> str:
+        """
+        Get a hash of the pipeline configuration.
+        It covers the classes and parameters of the steps and the source of the modules defining them,
+        so it changes whenever the pipeline would produce different outputs.
+        Returns:
+            str: The hexadecimal SHA-256 fingerprint.
+        """
+        description = _describe(
+            [self._source_fingerprints(self._step_modules()), self.steps]
+        )
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def _step_modules(self) -> set[str]:
+        modules = {type(self).__module__}
+        for name, step in self.steps:
+            if isinstance(step, Pipeline):
+                modules |= step._step_modules()
+            modules |= {
+                klass.__module__
+                for klass in type(step).__mro__
+                if klass.__module__ not in ("builtins", "abc")
+            }
+        # the steps read tables such as the character sets of shekar.utils at call time
+        return _package_dependencies(modules)
+
+    @staticmethod
+    def _source_fingerprints(modules) -> dict[str, str]:
+        # hashes the module files without importing them, so stale snapshots are rejected before unpickling
+        fingerprints = {}
+        for module in sorted(modules):
+            spec = importlib.util.find_spec(module)
+            if spec is None or spec.origin is None or not spec.has_location:
+                fingerprints[module] = None
+                continue
+            with open(spec.origin, "rb") as f:
+                fingerprints[module] = hashlib.sha256(f.read()).hexdigest()
+        return fingerprints
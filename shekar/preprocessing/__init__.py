@@ -13,6 +13,10 @@ from .transformations import (
     RedundantCharacterRemover,
     NonPersianRemover,
     HTMLTagRemover,
+    KeyNormalizer,
+    ScriptRatioGate,
+    LexiconMatcher,
+    LexiconMasker,
 )
 
 __all__ = [
@@ -30,4 +34,8 @@ __all__ = [
     "RedundantCharacterRemover",
     "NonPersianRemover",
     "HTMLTagRemover",
+    "KeyNormalizer",
+    "ScriptRatioGate",
+    "LexiconMatcher",
+    "LexiconMasker",
 ]
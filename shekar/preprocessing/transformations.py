@@ -1,14 +1,17 @@
-from typing import Iterable
+from typing import Iterable, Iterator
 from shekar.base import BaseTextTransformer
+from shekar.batch import TextBatch
 import shekar.utils as utils
 import re
-import emoji
-import polars as pl
 import html
 import string
+import pickle
 
 
 class PunctuationNormalizer(BaseTextTransformer):
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self.punctuation_mappings = [
@@ -44,6 +47,9 @@ class AlphabetNormalizer(BaseTextTransformer):
     This class is used to convert Arabic characters to their Persian equivalents.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self.character_mappings = [
@@ -105,6 +111,9 @@ class ArabicUnicodeNormalizer(BaseTextTransformer):
     Normalizes special Arabic unicode characters to their Persian equivalents.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self.unicode_mappings = [
@@ -132,6 +141,9 @@ class NumericNormalizer(BaseTextTransformer):
     Normalizes Arabic, English and other unicode number signs to Persian numbers.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self._number_mappings = [
@@ -169,6 +181,9 @@ class PunctuationRemover(BaseTextTransformer):
     If keep_persian is True, it will only remove non-Persian punctuations.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self, keep_persian=False):
         super().__init__()
 
@@ -193,6 +208,9 @@ class DiacriticsRemover(BaseTextTransformer):
     If diacritics is a string, it will remove only the specified diacritics.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self._diacritic_mappings = [
@@ -205,16 +223,139 @@ class DiacriticsRemover(BaseTextTransformer):
         return self._map_patterns(text, self._patterns)
 
 
+_zwj = "\u200d"
+_variation_selectors = "\ufe0e\ufe0f"
+_emoji_search = None
+
+
+def _get_emoji_search():
+    global _emoji_search
+    if _emoji_search is None:
+        from shekar.lexicons import load_emoji_table
+
+        table = load_emoji_table()
+        tree = {}
+        for sequence, component in table.items():
+            node = tree
+            for character in sequence:
+                node = node.setdefault(character, {})
+            node[None] = (
+                component  # no character is None, so it marks the end of a sequence
+            )
+
+        # the characters that the tokenizer of the emoji package does not pass through unchanged
+        starters = frozenset(tree) | frozenset(_variation_selectors)
+
+        # a superset of the starters and ZWJ with few ranges, which the re module searches quickly
+        ranges = []
+        for codepoint in sorted(map(ord, starters | {_zwj})):
+            if ranges and codepoint - ranges[-1][1] <= 64 and codepoint > 127:
+                ranges[-1][1] = codepoint
+            else:
+                ranges.append([codepoint, codepoint])
+        candidates = re.compile(
+            "["
+            + "".join(f"{re.escape(chr(a))}-{re.escape(chr(b))}" for a, b in ranges)
+            + "]"
+        )
+        _emoji_search = (tree, starters, candidates)
+    return _emoji_search
+
+
 class EmojiRemover(BaseTextTransformer):
     """
     Removes emojis from the text.
+    Emojis are matched against a precompiled table of emoji sequences, including ZWJ and
+    variation selector sequences, with the same results as emoji.replace_emoji. Texts without any
+    character that can start an emoji, such as ASCII or Persian texts, are returned as they are.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
+        self._tree, self._starters, self._candidates = _get_emoji_search()
 
     def _function(self, text: str) -> str:
-        return emoji.replace_emoji(text, replace="")
+        if text.isascii() or self._starters.isdisjoint(text):
+            return text
+        return self._remove(text)
+
+    def _remove(self, text: str) -> str:
+        # a port of the tokenizer of the emoji package, keeping the characters that are not emojis
+        tree = self._tree
+        output = []
+        tokens = []  # (characters, is_emoji) of the tokens that a ZWJ may still join
+        ignore = set()  # the ZWJs joining emojis that are not a sequence of the table
+        i = 0
+        while i < len(text):
+            character = text[i]
+            consumed = False
+            if (
+                character not in tree
+                and character != _zwj
+                and character not in _variation_selectors
+            ):
+                # every character up to the next candidate is kept and ends the previous tokens
+                match = self._candidates.search(text, i + 1)
+                end = match.start() if match else len(text)
+                output.extend(c for c, is_emoji in tokens if not is_emoji)
+                output.append(text[i : end - 1])
+                tokens = [(text[end - 1], False)]
+                i = end
+                continue
+            elif i in ignore:
+                i += 1
+                continue
+            elif character in tree:
+                j = i + 1
+                node = tree[character]
+                while j < len(text) and text[j] in node and j not in ignore:
+                    node = node[text[j]]
+                    j += 1
+                if None in node:
+                    tokens.append((text[i:j], True))
+                    i = j - 1
+                    consumed = True
+            elif (
+                character == _zwj
+                and tokens
+                and self._is_sequence(tokens[-1][0])
+                and i > 0
+                and text[i - 1] in tree
+            ):
+                # join the previous emoji with the next one, and match them again
+                ignore.add(i)
+                if self._is_sequence(tokens[-1][0], component=True):
+                    i -= sum(len(characters) for characters, _ in tokens[-2:])
+                    if text[i] == _zwj:
+                        i += 1
+                        del tokens[-1]
+                    else:
+                        del tokens[-2:]
+                else:
+                    i -= len(tokens[-1][0])
+                    del tokens[-1]
+                continue
+            elif tokens:
+                output.extend(c for c, is_emoji in tokens if not is_emoji)
+                tokens = []
+
+            if not consumed and character not in _variation_selectors:
+                tokens.append((character, False))
+            i += 1
+
+        output.extend(c for c, is_emoji in tokens if not is_emoji)
+        return "".join(output)
+
+    def _is_sequence(self, characters: str, component: bool = False) -> bool:
+        node = self._tree
+        for character in characters:
+            node = node.get(character)
+            if node is None:
+                return False
+        return node.get(None, False) is True if component else None in node
 
 
 class EmailMasker(BaseTextTransformer):
@@ -222,6 +363,8 @@ class EmailMasker(BaseTextTransformer):
     Masks email addresses in the text.
     """
 
+    batchable = True
+
     def __init__(self, mask: str = "<EMAIL>"):
         super().__init__()
         self.mask = mask
@@ -239,6 +382,8 @@ class URLMasker(BaseTextTransformer):
     Masks URLs in the text.
     """
 
+    batchable = True
+
     def __init__(self, mask: str = "<URL>"):
         super().__init__()
         self.mask = mask
@@ -293,15 +438,23 @@ class StopwordRemover(BaseTextTransformer):
 
     def __init__(self, stopwords: Iterable[str] = None):
         super().__init__()
-        self.stopwords = stopwords or utils.stopwords
+        from shekar.lexicons import SortedLexicon, load_lexicon
+
+        if stopwords is None:
+            stopwords = load_lexicon("stopwords")
+        self.stopwords = stopwords
+        if hasattr(self.stopwords, "columns"):
+            # a polars table such as utils.stopwords
+            self._stopwords = set(self.stopwords["word"].to_list())
+        elif isinstance(self.stopwords, (SortedLexicon, set, frozenset)):
+            # already a membership structure, a compiled lexicon is searched in place
+            self._stopwords = self.stopwords
+        else:
+            self._stopwords = set(self.stopwords)
 
     def _function(self, text: str) -> str:
         words = text.split()
-        return " ".join(
-            word
-            for word in words
-            if not self.stopwords.filter(pl.col("word") == word).height > 0
-        )
+        return " ".join(word for word in words if word not in self._stopwords)
 
 
 class HTMLTagRemover(BaseTextTransformer):
@@ -321,12 +474,148 @@ class HTMLTagRemover(BaseTextTransformer):
         text = html.unescape(text)
         return self._map_patterns(text, self._patterns)
 
+    @staticmethod
+    def stream(source, chunk_size: int = 1 << 16) -> Iterator[str]:
+        """
+        Incrementally convert an HTML document to text.
+        Script, style and comment blocks are dropped, entities are decoded, and block-level tags
+        such as p, div, li and br become newlines. Every chunk is processed up to the last complete
+        tag or entity, and only the rest is carried over, so memory stays bounded whatever the size
+        of the document.
+        Args:
+            source (str | Iterable[str] | TextIO): The document, as a string, an iterable of chunks or a text file object.
+            chunk_size (int, optional): The number of characters read at once from a string or a file. Defaults to 65536.
+        Returns:
+            Iterator[str]: Pieces of the text of the document, to be concatenated.
+        Example:
+            >>> with open("page.html", encoding="utf-8") as f:
+            ...     text = "".join(HTMLTagRemover.stream(f))
+        """
+        if isinstance(source, str):
+            chunks = (
+                source[i : i + chunk_size] for i in range(0, len(source), chunk_size)
+            )
+        elif hasattr(source, "read"):
+            chunks = iter(lambda: source.read(chunk_size), "")
+        else:
+            chunks = source
+
+        carry = ""
+        for chunk in chunks:
+            buffer = carry + chunk
+            cut = _html_safe_cut(buffer)
+            carry = buffer[cut:]
+            if cut:
+                yield _html_to_text(buffer[:cut])
+
+            while len(carry) > max(2 * chunk_size, _html_max_tag_size):
+                lt = carry.find("<")
+                if lt != 0:
+                    # a partial entity held back before the tag, which ends it
+                    lt = len(carry) if lt == -1 else lt
+                    yield _html_to_text(carry[:lt])
+                    carry = carry[lt:]
+                    continue
+                if _html_unterminated_start(carry) == 0:
+                    carry = _html_shrink_block(carry)
+                    break
+                # a "<" that opens no tag within the limit is text
+                buffer = carry[1:]
+                cut = _html_safe_cut(buffer)
+                carry = buffer[cut:]
+                yield "<" + _html_to_text(buffer[:cut])
+
+        # an unterminated script, style or comment block runs to the end of the document
+        unterminated = _html_unterminated_start(carry)
+        if unterminated != -1:
+            carry = carry[:unterminated]
+        if carry:
+            yield _html_to_text(carry)
+
+
+_html_skipped_tags = "script|style|noscript|template"
+_html_block_tags = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "td", "th", "tr", "ul",
+}  # fmt: skip
+_html_closed_blocks = (
+    r"<!--.*?-->"
+    rf"|<(?P<skip>{_html_skipped_tags})\b[^>]*>.*?</(?P=skip)\s*>"
+)
+_html_tags = (
+    r"</?(?P<tag>[a-zA-Z][^\s/<>]*)(?:[\s/](?:[^<>\"']|\"[^\"]*\"|'[^']*')*)?>"
+    r"|<!(?!--)[^>]*>|<\?[^>]*>"
+)
+_html_markup = re.compile(
+    _html_closed_blocks + "|" + _html_tags, re.IGNORECASE | re.DOTALL
+)
+# closed blocks are consumed first, so an opener only matches outside them, and it is
+# tried before plain tags so that an unclosed <script> is not stripped like a <p>
+_html_block_scanner = re.compile(
+    _html_closed_blocks + rf"|(?P<open><!--|<(?:{_html_skipped_tags})\b)|" + _html_tags,
+    re.IGNORECASE | re.DOTALL,
+)
+_html_max_tag_size = 1 << 16
+_html_partial_entity = re.compile(r"&[#\w]{0,32}\Z")
+
+
+def _html_replace_markup(match) -> str:
+    tag = match.group("tag")
+    return "\n" if tag is not None and tag.lower() in _html_block_tags else ""
+
+
+def _html_unterminated_start(buffer: str) -> int:
+    # the start of the first script, style or comment block that is not closed, or -1,
+    # scanning from left to right like _html_markup so that a "<!--" inside a script is ignored
+    for match in _html_block_scanner.finditer(buffer):
+        if match.group("open") is not None:
+            return match.start()
+    return -1
+
+
+def _html_safe_cut(buffer: str) -> int:
+    # the end of the prefix of a buffer that holds no unfinished block, tag or entity
+    cut = len(buffer)
+    unterminated = _html_unterminated_start(buffer)
+    if unterminated != -1:
+        cut = unterminated
+
+    lt = buffer.rfind("<", 0, cut)
+    if lt != -1 and (
+        lt == cut - 1
+        or (buffer[lt + 1].isalpha() or buffer[lt + 1] in "/!?")
+        and _html_markup.match(buffer, lt, cut) is None
+    ):
+        cut = lt  # a tag that continues in the next chunk
+
+    entity = _html_partial_entity.search(buffer, 0, cut)
+    if entity is not None:
+        cut = entity.start()
+    return cut
+
+
+def _html_to_text(fragment: str) -> str:
+    return html.unescape(_html_markup.sub(_html_replace_markup, fragment))
+
+
+def _html_shrink_block(carry: str) -> str:
+    # the content of a long unterminated block is dropped, keeping what is needed to find its end
+    opening_end = 4 if carry.startswith("<!--") else carry.find(">") + 1
+    if opening_end <= 0:
+        return carry
+    return carry[:opening_end] + carry[-16:]
+
 
 class RedundantCharacterRemover(BaseTextTransformer):
     """
     Removes more than two repeated letters and every keshida from the text.
     """
 
+    batchable = True
+    token_local = True
+
     def __init__(self):
         super().__init__()
         self._redundant_mappings = [
@@ -370,3 +659,406 @@ class NonPersianRemover(BaseTextTransformer):
 
     def _function(self, text: str) -> str:
         return self._map_patterns(text, self._patterns)
+
+
+class KeyNormalizer(BaseTextTransformer):
+    """
+    Fast character-level normalization for building lookup keys.
+    It folds the character variants handled by AlphabetNormalizer and NumericNormalizer,
+    and drops diacritics, keshida and zero-width characters, using a single str.translate call.
+    The output is meant for matching words against a vocabulary, not for display.
+    """
+
+    batchable = True
+    token_local = True
+
+    def __init__(self):
+        super().__init__()
+        table = {}
+        for pattern, replacement in (
+            AlphabetNormalizer().character_mappings
+            + NumericNormalizer()._number_mappings
+        ):
+            for character in pattern.strip("[]"):
+                table[ord(character)] = replacement
+
+        for character in (
+            utils.diacritics
+            + "ـ"
+            + "\u200c\u200b\u200d\u200e\u200f\u2066\u2067\u202a\u202b\u202d"
+        ):
+            table[ord(character)] = None
+
+        self._table = table
+
+    def _function(self, text: str) -> str:
+        return text.translate(self._table)
+
+
+_script_classes = [
+    "neutral",
+    "persian_letter",
+    "persian_digit",
+    "diacritic",
+    "arabic_letter",
+    "arabic_digit",
+    "latin",
+    "other",
+]
+_persian_classes = [1, 2, 3]
+
+
+class ScriptRatioGate(BaseTextTransformer):
+    """
+    Drops texts that are mostly not written in the Persian script, before the expensive steps of a pipeline run.
+    The score of a text is the share of Persian letters, Persian digits and diacritics among its
+    letters and digits; spaces, punctuation, ASCII digits and emojis are neutral. Arabic-only
+    letters such as ك and ة count against the score.
+    Characters are classified with a codepoint lookup table, counting a whole batch of texts at once.
+    Rejected texts are dropped, or passed to on_reject to route them elsewhere; with a single text,
+    a rejected text is returned as None.
+    Example:
+        >>> gate = ScriptRatioGate(threshold=0.5)
+        >>> list(gate(["سلام دنیا", "hello world", "سلام world!"]))
+        ['سلام دنیا', 'سلام world!']
+    """
+
+    script_classes = _script_classes
+
+    def __init__(self, threshold: float = 0.5, on_reject=None):
+        """
+        Args:
+            threshold (float, optional): The minimum score of the texts that pass the gate. Defaults to 0.5.
+            on_reject (Callable[[str], None], optional): Called with every rejected text. Defaults to None.
+        """
+        super().__init__()
+        import numpy as np
+
+        self._np = np
+        self.threshold = threshold
+        self.on_reject = on_reject
+
+        # codepoints above the BMP, mostly emojis, are clipped to U+FFFF which is neutral
+        classes = [0] * 0x10000
+        for character in map(chr, range(0x10000)):
+            if character.isalpha():
+                classes[ord(character)] = 6 if character.isascii() else 7
+            elif character.isdigit() and not character.isascii():
+                classes[ord(character)] = 7
+        # variants of Persian letters, such as presentation forms, are folded by AlphabetNormalizer
+        for pattern, replacement in AlphabetNormalizer().character_mappings:
+            if replacement in utils.persian_letters:
+                for character in pattern.strip("[]"):
+                    classes[ord(character)] = 1
+        for characters, script_class in (
+            ("ـ", 0),
+            (utils.persian_letters, 1),
+            (utils.persian_digits, 2),
+            (utils.diacritics, 3),
+            (utils.arabic_letters, 4),
+            (utils.arabic_numbers, 5),
+        ):
+            for character in characters:
+                classes[ord(character)] = script_class
+        self._table = np.array(classes, dtype=np.uint8)
+
+    def histograms(self, texts: Iterable[str]):
+        """
+        Count the characters of every script class in texts.
+        Args:
+            texts (Iterable[str] | TextBatch): The texts.
+        Returns:
+            np.ndarray: A (len(texts), len(script_classes)) array of counts.
+        """
+        np = self._np
+        batch = texts if isinstance(texts, TextBatch) else TextBatch.from_texts(texts)
+        # lone surrogates are valid in a str, they are kept as their own codepoints
+        codepoints = np.frombuffer(
+            batch.buffer.encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32
+        )
+        classes = self._table[np.minimum(codepoints, 0xFFFF)]
+
+        # the offsets include one separator after each text, the last one is not in the buffer
+        lengths = np.diff(np.frombuffer(batch.offsets, dtype=np.int64))
+        documents = np.repeat(np.arange(len(batch)), lengths)[: len(codepoints)]
+        n_classes = len(self.script_classes)
+        counts = np.bincount(
+            documents * n_classes + classes, minlength=len(batch) * n_classes
+        )
+        return counts.reshape(len(batch), n_classes)
+
+    def scores(self, texts: Iterable[str]):
+        """
+        Compute the Persian script ratio of texts.
+        Args:
+            texts (Iterable[str] | TextBatch): The texts.
+        Returns:
+            np.ndarray: The score of every text, between 0 and 1. Texts without letters or digits score 1.
+        """
+        histograms = self.histograms(texts)
+        persian = histograms[:, _persian_classes].sum(axis=1)
+        total = histograms[:, 1:].sum(axis=1)
+        return persian / self._np.maximum(total, 1) + (total == 0)
+
+    def _reject(self, text: str):
+        if self.on_reject is not None:
+            self.on_reject(text)
+
+    def _function(self, text: str) -> str | None:
+        if self.scores([text])[0] >= self.threshold:
+            return text
+        self._reject(text)
+        return None
+
+    def _filter(self, texts: list[str]) -> list[str]:
+        kept = []
+        for text, score in zip(texts, self.scores(texts)):
+            if score >= self.threshold:
+                kept.append(text)
+            else:
+                self._reject(text)
+        return kept
+
+    def transform(self, X, batch_size: int = 1024):
+        if isinstance(X, str):
+            return self._function(X)
+        elif isinstance(X, TextBatch):
+            return TextBatch.from_texts(self._filter(X.to_list()))
+        elif isinstance(X, Iterable):
+
+            def generator():
+                batch = []
+                for text in X:
+                    batch.append(text)
+                    if len(batch) == batch_size:
+                        yield from self._filter(batch)
+                        batch = []
+                if batch:
+                    yield from self._filter(batch)
+
+            return generator()
+        else:
+            raise ValueError("Input must be a string or a Iterable of strings.")
+
+
+# a word is a run of letters, digits and combining marks, possibly joined by ZWNJs, and any other
+# non-space character is a word of its own
+_word_characters = r"[\w\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]"
+_lexicon_words = re.compile(
+    rf"{_word_characters}+(?:\u200c+{_word_characters}+)*|[^\s\w\u200c-\u200f]"
+)
+
+
+class LexiconMatcher:
+    """
+    Finds the terms of a large lexicon in texts with an Aho-Corasick automaton over words.
+    Terms of one or more words match whole words only. A ZWNJ joins the parts of a word rather than
+    separating words, so "کتاب" does not match in "کتاب‌ها" as it would with a regex word boundary.
+    In normalized mode, the words of the terms and texts are compared by their KeyNormalizer form,
+    so "كتاب" matches "کتاب" and "میروم" matches "می‌روم". Every text is scanned in one pass whatever
+    the size of the lexicon, and the compiled automaton can be saved and loaded.
+    Example:
+        >>> matcher = LexiconMatcher({"تهران": "CITY", "دانشگاه تهران": "ORG"})
+        >>> matcher.spans("او در دانشگاه تهران درس می‌خواند")
+        [(6, 19, 'ORG')]
+    """
+
+    snapshot_format_version = 1
+
+    def __init__(self, terms: Iterable[str] | dict[str, str], normalized: bool = False):
+        """
+        Args:
+            terms (Iterable[str] | dict[str, str]): The terms, or a mapping from the terms to their labels.
+                The label of a term given without one is the term itself.
+            normalized (bool, optional): Whether words are compared by their normalized form. Defaults to False.
+        """
+        self.normalized = normalized
+        self._table = KeyNormalizer()._table if normalized else None
+        self._transitions = [{}]  # node -> word -> node
+        self._fail = [0]
+        # node -> ((number of words, label), ...) of the terms ending there
+        self._outputs = [()]
+        self._size = 0
+
+        items = terms.items() if isinstance(terms, dict) else ((t, t) for t in terms)
+        for term, label in items:
+            self._add(term, label)
+        self._build()
+
+    def _words(self, text: str) -> list[str]:
+        words = _lexicon_words.findall(text)
+        if self._table is not None:
+            words = [word.translate(self._table) for word in words]
+        return [word for word in words if word]
+
+    def _add(self, term: str, label: str):
+        words = self._words(term)
+        if not words:
+            return
+        node = 0
+        for word in words:
+            next_node = self._transitions[node].get(word)
+            if next_node is None:
+                next_node = len(self._transitions)
+                self._transitions[node][word] = next_node
+                self._transitions.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            node = next_node
+        # the first of several terms with the same words wins
+        if not self._outputs[node]:
+            self._outputs[node] = ((len(words), label),)
+            self._size += 1
+
+    def _build(self):
+        # breadth-first, so that the failure node of every node is complete before it
+        queue = list(self._transitions[0].values())
+        for node in queue:
+            for word, child in self._transitions[node].items():
+                fail = self._fail[node]
+                while fail and word not in self._transitions[fail]:
+                    fail = self._fail[fail]
+                fail = self._transitions[fail].get(word, 0)
+                self._fail[child] = fail
+                # the terms ending at the failure node are suffixes of the terms ending here
+                self._outputs[child] += self._outputs[fail]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _matches(self, text: str) -> Iterator[tuple[int, int, str]]:
+        transitions, fail, outputs, table = (
+            self._transitions,
+            self._fail,
+            self._outputs,
+            self._table,
+        )
+        root = transitions[0]
+        state = 0
+        starts = []
+        for match in _lexicon_words.finditer(text):
+            word = match.group()
+            if table is not None:
+                word = word.translate(table)
+                if not word:
+                    continue
+            starts.append(match.start())
+            if state == 0:
+                state = root.get(word, 0)
+            else:
+                while state and word not in transitions[state]:
+                    state = fail[state]
+                state = transitions[state].get(word, 0)
+            if outputs[state]:
+                end = match.end()
+                for n_words, label in outputs[state]:
+                    yield starts[-n_words], end, label
+
+    def spans(self, text: str, overlapping: bool = False) -> list[tuple[int, int, str]]:
+        """
+        Find the terms in a text.
+        Args:
+            text (str): The text.
+            overlapping (bool, optional): Whether to return every match, including overlapping ones.
+                Otherwise the leftmost longest matches are kept. Defaults to False.
+        Returns:
+            list[tuple[int, int, str]]: The (start, end, label) of every match, by position.
+        """
+        matches = sorted(self._matches(text), key=lambda m: (m[0], -m[1]))
+        if overlapping:
+            return matches
+        selected = []
+        end = -1
+        for match in matches:
+            if match[0] >= end:
+                selected.append(match)
+                end = match[1]
+        return selected
+
+    def contains(self, text: str) -> bool:
+        """
+        Check whether a text contains any term, stopping at the first match.
+        Args:
+            text (str): The text.
+        Returns:
+            bool: True if a term is found.
+        """
+        return next(self._matches(text), None) is not None
+
+    def save(self, path):
+        """
+        Save the compiled automaton, which loads faster than it builds.
+        Args:
+            path (str | Path): The destination path.
+        """
+        with open(path, "wb") as f:
+            pickle.dump(
+                {"format": self.snapshot_format_version},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path) -> "LexiconMatcher":
+        """
+        Load a matcher saved with LexiconMatcher.save.
+        Args:
+            path (str | Path): The snapshot path.
+        Returns:
+            LexiconMatcher: The restored matcher.
+        """
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("format") != cls.snapshot_format_version:
+                raise ValueError(f"Unsupported matcher snapshot format in {path}.")
+            matcher = pickle.load(f)
+
+        if not isinstance(matcher, cls):
+            raise ValueError(f"{path} is not a {cls.__name__} snapshot.")
+        return matcher
+
+
+class LexiconMasker(BaseTextTransformer):
+    """
+    Masks the terms of a large lexicon in the text, such as profanity, brand names or person names.
+    Matching is done by a LexiconMatcher, so only whole words match and the leftmost longest term wins.
+    Example:
+        >>> masker = LexiconMasker(["دانشگاه تهران"], mask="<ORG>")
+        >>> masker("او در دانشگاه تهران درس می‌خواند")
+        'او در <ORG> درس می‌خواند'
+    """
+
+    def __init__(
+        self,
+        terms: Iterable[str] | dict[str, str] | LexiconMatcher,
+        mask: str = "<MASK>",
+        normalized: bool = False,
+    ):
+        """
+        Args:
+            terms (Iterable[str] | dict[str, str] | LexiconMatcher): The terms, a mapping from the terms
+                to their labels, or a matcher, e.g. loaded with LexiconMatcher.load.
+            mask (str, optional): The replacement of the matches, None to replace them by their labels. Defaults to "<MASK>".
+            normalized (bool, optional): Whether words are compared by their normalized form.
+                Ignored when a matcher is given. Defaults to False.
+        """
+        super().__init__()
+        if not isinstance(terms, LexiconMatcher):
+            terms = LexiconMatcher(terms, normalized=normalized)
+        self.matcher = terms
+        self.mask = mask
+
+    def _function(self, text: str) -> str:
+        spans = self.matcher.spans(text)
+        if not spans:
+            return text
+        pieces = []
+        position = 0
+        for start, end, label in spans:
+            pieces.append(text[position:start])
+            pieces.append(label if self.mask is None else self.mask)
+            position = end
+        pieces.append(text[position:])
+        return "".join(pieces)
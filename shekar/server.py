@@ -0,0 +1,373 @@
+import asyncio
+import functools
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+_worker_state = {}
+
+
+def _init_worker(spell_checker_words=None):
+    from shekar.normalizer import Normalizer
+    from shekar.spell_checker import SpellChecker
+    from shekar.tokenizers import WordTokenizer
+
+    _worker_state["normalizer"] = Normalizer()
+    _worker_state["tokenizer"] = WordTokenizer()
+    _worker_state["spell_checker"] = (
+        SpellChecker(words=spell_checker_words) if spell_checker_words else None
+    )
+
+
+def _run_task(task: str, texts: list[str]) -> list:
+    if task == "normalize":
+        return list(_worker_state["normalizer"].normalize(texts))
+    if task == "tokenize":
+        return [_worker_state["tokenizer"].tokenize(text) for text in texts]
+    if task == "spellcheck":
+        return [_worker_state["spell_checker"].correct_text(text) for text in texts]
+    raise ValueError(f"Unknown task: {task}")
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submissions into batches that run on an executor.
+    A batch is dispatched when it reaches max_batch_size items or when its oldest
+    submission has waited max_delay seconds, whichever comes first. When a batch fails,
+    each of its submissions is run again on its own, so an error is only returned to
+    the submissions that raise it.
+    """
+
+    def __init__(self, function, executor, max_batch_size=64, max_delay=0.005):
+        """
+        Args:
+            function (Callable[[list], list]): Processes a batch of items and returns one result per item.
+            executor (concurrent.futures.Executor): The pool the batches run on.
+            max_batch_size (int, optional): The maximum number of items per batch. Defaults to 64.
+            max_delay (float, optional): The maximum time in seconds a submission waits for a batch to fill. Defaults to 0.005.
+        """
+        self.function = function
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._pending_items = 0
+        self._timer = None
+
+    async def submit(self, items: list) -> list:
+        """
+        Submit items to be processed in the next batch.
+        Args:
+            items (list): The items to process.
+        Returns:
+            list: The results of the items.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((items, future))
+        self._pending_items += len(items)
+        if self._pending_items >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_items = self._pending, [], 0
+        if not pending:
+            return
+
+        batch = [item for items, _ in pending for item in items]
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.get_running_loop().run_in_executor(
+            self.executor, self.function, batch
+        )
+        task.add_done_callback(functools.partial(self._distribute, pending))
+
+    def _distribute(self, pending, task):
+        if task.exception() is not None:
+            if len(pending) == 1:
+                _, future = pending[0]
+                if not future.done():
+                    future.set_exception(task.exception())
+                return
+            # a single failing item fails its whole batch, so every submission is
+            # retried alone and the error only reaches the submissions that cause it
+            loop = asyncio.get_running_loop()
+            for items, future in pending:
+                retry = loop.run_in_executor(self.executor, self.function, items)
+                retry.add_done_callback(
+                    functools.partial(self._distribute, [(items, future)])
+                )
+            return
+
+        results = task.result()
+        start = 0
+        for items, future in pending:
+            if not future.done():
+                future.set_result(results[start : start + len(items)])
+            start += len(items)
+
+
+class EndpointStats:
+    def __init__(self, window: int = 10000):
+        self.requests = 0
+        self.items = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=window)
+
+    def record(self, items: int, latency: float):
+        self.requests += 1
+        self.items += items
+        self._latencies.append(latency)
+
+    def snapshot(self, uptime: float, batcher: MicroBatcher) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return 1000 * latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            "requests": self.requests,
+            "items": self.items,
+            "errors": self.errors,
+            "batches": batcher.batches,
+            "mean_batch_size": batcher.items / batcher.batches
+            if batcher.batches
+            else None,
+            "throughput_items_per_s": self.items / uptime if uptime > 0 else None,
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": 1000 * latencies[-1] if latencies else None,
+            },
+        }
+
+
+class NormalizationServer:
+    """
+    A local HTTP server for the Normalizer, WordTokenizer and SpellChecker.
+    Concurrent requests are coalesced into micro-batches that run on a worker pool.
+    Endpoints:
+        POST /normalize, /tokenize and /spellcheck with a JSON body {"text": str} or {"texts": [str, ...]},
+        answered with {"result": ...} or {"results": [...]}.
+        GET /stats for latency and throughput statistics, and GET /health.
+    Example:
+        >>> server = NormalizationServer(port=8000)
+        >>> asyncio.run(server.serve_forever())
+    """
+
+    tasks = ["normalize", "tokenize", "spellcheck"]
+    max_body_size = 16 * 1024**2
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+        workers: int = 0,
+        spell_checker_words=None,
+    ):
+        """
+        Args:
+            host (str, optional): The address to bind. Defaults to "127.0.0.1".
+            port (int, optional): The port to bind, 0 for any free port. Defaults to 8000.
+            max_batch_size (int, optional): The maximum number of texts per batch. Defaults to 64.
+            max_delay (float, optional): The maximum time in seconds a request waits for its batch to fill. Defaults to 0.005.
+            workers (int, optional): The number of worker processes. With 0, batches run on a single thread
+                of the server process. Defaults to 0.
+            spell_checker_words (Counter, optional): Word frequencies that enable the /spellcheck endpoint. Defaults to None.
+        """
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.workers = workers
+        self.spell_checker_words = spell_checker_words
+        self._server = None
+        self._executor = None
+        self._batchers = {}
+        self._stats = {}
+        self._started_at = None
+
+    async def start(self):
+        """
+        Start the worker pool and listen for connections.
+        """
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.spell_checker_words,),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                initializer=_init_worker,
+                initargs=(self.spell_checker_words,),
+            )
+
+        tasks = self.tasks if self.spell_checker_words else self.tasks[:2]
+        for task in tasks:
+            self._batchers[task] = MicroBatcher(
+                functools.partial(_run_task, task),
+                self._executor,
+                max_batch_size=self.max_batch_size,
+                max_delay=self.max_delay,
+            )
+            self._stats[task] = EndpointStats()
+
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started_at = time.perf_counter()
+
+    async def close(self):
+        """
+        Stop listening and shut down the worker pool.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    def stats(self) -> dict:
+        """
+        Get the latency and throughput statistics of every endpoint.
+        Returns:
+            dict: The statistics.
+        """
+        uptime = time.perf_counter() - self._started_at
+        return {
+            "uptime_s": uptime,
+            "workers": self.workers,
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": 1000 * self.max_delay,
+            "endpoints": {
+                task: self._stats[task].snapshot(uptime, self._batchers[task])
+                for task in self._batchers
+            },
+        }
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(
+                        writer, 400, {"error": "malformed request line"}
+                    )
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._respond(
+                        writer, 400, {"error": "invalid Content-Length"}
+                    )
+                    break
+                if length > self.max_body_size:
+                    await self._respond(writer, 413, {"error": "body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version == "HTTP/1.1"
+                )
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+
+        task = path.strip("/")
+        if method != "POST" or task not in self._batchers:
+            return 404, {"error": f"no endpoint {method} {path}"}
+
+        try:
+            request = json.loads(body)
+            single = "text" in request
+            texts = [request["text"]] if single else request["texts"]
+            if not isinstance(texts, list) or not all(
+                isinstance(text, str) for text in texts
+            ):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return 400, {
+                "error": 'expected a JSON body {"text": str} or {"texts": [str]}'
+            }
+
+        start = time.perf_counter()
+        try:
+            results = await self._batchers[task].submit(texts)
+        except Exception as e:
+            self._stats[task].errors += 1
+            return 500, {"error": str(e)}
+        self._stats[task].record(len(texts), time.perf_counter() - start)
+
+        if single:
+            return 200, {"result": results[0]}
+        return 200, {"results": results}
+
+    @staticmethod
+    async def _respond(writer, status: int, payload: dict, keep_alive: bool = False):
+        reasons = {
+            200: "OK",
+            400: "Bad Request",
+            404: "Not Found",
+            413: "Payload Too Large",
+            500: "Internal Server Error",
+        }
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
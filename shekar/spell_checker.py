@@ -1,6 +1,20 @@
+import time
 from collections import Counter
 from shekar.tokenizers import WordTokenizer
 from shekar import utils
+from shekar.metrics import registry as _metrics
+
+_lookups = _metrics.counter(
+    "shekar_spellchecker_lookups_total", "Words looked up by SpellChecker.correct."
+)
+_candidates = _metrics.histogram(
+    "shekar_spellchecker_candidates",
+    "Edit candidates generated per SpellChecker.correct lookup.",
+    buckets=(10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+_lookup_seconds = _metrics.histogram(
+    "shekar_spellchecker_lookup_seconds", "Latency of SpellChecker.correct."
+)
 
 
 class SpellChecker:
@@ -25,6 +39,21 @@ class SpellChecker:
         self.words = {word: freq / self.n_words for word, freq in words.items()}
         self.n_edit = n_edit
 
+    @classmethod
+    def from_frequencies(cls, path, n_edit=2, min_count=1) -> "SpellChecker":
+        """
+        Create a spell checker from a word frequency file, such as one written by VocabularyBuilder.
+        Args:
+            path (str | Path): The file with one "word<TAB>count" pair per line.
+            n_edit (int, optional): The maximum number of edits allowed for a word. Defaults to 2.
+            min_count (int, optional): The minimum count of the words to keep. Defaults to 1.
+        Returns:
+            SpellChecker: The spell checker.
+        """
+        from shekar.corpus import read_frequencies
+
+        return cls(n_edit=n_edit, words=read_frequencies(path, min_count=min_count))
+
     @classmethod
     def generate_1edits(cls, word):
         deletes = [word[:i] + word[i + 1 :] for i in range(len(word))]
@@ -56,17 +85,17 @@ class SpellChecker:
             return edits_n
 
     def correct(self, word, n_best=5):
+        start = time.perf_counter() if _metrics.enabled else None
         suggestions = []
         if word in self.words:
             suggestions.append((word, self.words[word]))
 
+        n_candidates = 0
         for n in range(1, self.n_edit + 1):
+            edits = self.generate_n_edits(word, n=n)
+            n_candidates += len(edits)
             suggestions += sorted(
-                [
-                    (w, self.words[w])
-                    for w in self.generate_n_edits(word, n=n)
-                    if w in self.words
-                ],
+                [(w, self.words[w]) for w in edits if w in self.words],
                 key=lambda x: x[1],
                 reverse=True,
             )
@@ -78,6 +107,10 @@ class SpellChecker:
                 unique_suggestions.append(suggestion[0])
             seen.add(suggestion[0])
 
+        if start is not None:
+            _lookups.inc()
+            _candidates.observe(n_candidates)
+            _lookup_seconds.observe(time.perf_counter() - start)
         return unique_suggestions[:n_best]
 
     def correct_text(self, text):
@@ -1,6 +1,16 @@
 import re
 from typing import List
 
+from shekar.batch import TextBatch
+from shekar.metrics import registry as _metrics
+
+_tokenized_texts = _metrics.counter(
+    "shekar_tokenizer_texts_total", "Texts tokenized by WordTokenizer."
+)
+_tokens = _metrics.counter(
+    "shekar_tokenizer_tokens_total", "Tokens produced by WordTokenizer."
+)
+
 
 class SentenceTokenizer:
     """
@@ -48,4 +58,39 @@ class WordTokenizer:
 
     @classmethod
     def tokenize(cls, text):
-        return cls.pattern.findall(text)
+        tokens = cls.pattern.findall(text)
+        if _metrics.enabled:
+            _tokenized_texts.inc()
+            _tokens.inc(len(tokens))
+        return tokens
+
+    @classmethod
+    def tokenize_batch(cls, batch: TextBatch) -> List[List[str]]:
+        """
+        Tokenizes every text of a batch with a single pass over its buffer.
+        The separator between texts is matched as a token of its own, which marks where the tokens
+        of the next text start.
+
+        Args:
+            batch (TextBatch): The texts to be tokenized.
+
+        Returns:
+            List[List[str]]: The tokens of each text.
+        """
+        if not batch._separable or len(batch) == 0:
+            return [cls.tokenize(text) for text in batch]
+
+        separator = batch.separator
+        documents = []
+        tokens = []
+        for token in cls.pattern.findall(batch.buffer):
+            if token == separator:
+                documents.append(tokens)
+                tokens = []
+            else:
+                tokens.append(token)
+        documents.append(tokens)
+        if _metrics.enabled:
+            _tokenized_texts.inc(len(documents))
+            _tokens.inc(sum(map(len, documents)))
+        return documents
@@ -1,6 +1,8 @@
-import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-import polars as pl
+from typing import Any, Callable, Iterable, Iterator
+import regex
 
 data_root_path = Path(__file__).parent / "data"
 
@@ -26,10 +28,27 @@ punctuations = (
 spaces = "\u200c" + " "
 right_to_left_mark = "\u200f"
 arabic_numbers = "٠١٢٣٤٥٦٧٨٩"
+arabic_letters = "كيىةۃٱإ"  # used in Arabic but not in the Persian script
 punc_after = r".\.:!،؛؟»\]\)\}"
 punc_before = r"«\[\(\{"
 
 
+informal_patterns = [
+    r"(?:ن?می‌? ?|ب|ن)(?:[یا]فشون|پاشون|پرورون|پرون|پوسون|پوشون|پیچون|تابون|تازون|ترسون|ترکون|تکون|تونست|جنبون|جوشون|چپون|چربون|چرخون|چرون|چسبون|چشون|چکون|چلون|خارون|خراشون|خشکون|خندون|خوابون|خورون|خون|خیسون|درخشون|رسون|رقصون|رنجون|رون|دون|سابون|ستون|سوزون|ش|شورون|غلتون|فهمون|کوبون|گذرون|گردون|گریون|گزین|گسترون|گنجون|لرزون|لغزون|لمبون|مالون|ا?نداز|نشون|هراسون|وزون)(?:م|ی|ه|یم|ید|ن)",
+    r"(?:ن?می‌? ?|ب|ن)(?:چا|خا|خوا)(?:م|ی|د|یم|ید|ن)",
+    r"(?:ن?می‌? ?|ب)(?:مون|شین|گ)(?:م|ی|ه|یم|ید|ن)",
+    r"(?:ن?می‌? ?|ن)(?:دون|د|تون)(?:م|ی|ه|یم|ید|ن)",
+    r"(?:نمی‌? ?|ن)(?:یا)(?:م|ه|یم|ید|ن)",
+    r"(?:می‌? ?)(?:ر)(?:م|ی|ه|یم|ید|ن)",
+    r"(?:ن?می‌? ?|ب|ن)(?:در|پا|کاه|گا|ایست)ن",
+    r"(?:ن?می‌? ?|ب|ن)دون(?:م|ی|ه|یم|ید|ن)",
+    r"(?:ازش|اونه?ا|ایشون|اینجوری?|این[وه]|بازم|باهاش|براتون|برام|بهش|بی‌خیال|تموم|چ?جوری|چیه|دیگه|کدوم|مونده|زبون|همینه)",
+    r"(?:آروم|آشیونه|آشیون|اومدم|برم|اونه|اون‌|ایرونی|اینا|بادمجون|بدونیم|بذار|بریم|بشیم|بشین|بنداز|بچگونه|بیابون|بیگیر|تهرون|تونستم|خمیردندون|خودتون|خودشون|خودمونی|خودمون)",
+    r"(?:خوروندن|خونه|خیابون|داره|داروخونه|داغون|دخترونه|دندون|رودخونه|زمونه|زنونه|سوزوندن|قلیون|مردونه|مهمون|موندم|میام|میونه|میون|می‌دونیم|نتونستم|ندونیم)",
+    r"(?:نذار|نریم|نسوزوندن|نشونه|نشون|نموندم|نمیاد|نمیام|نمیان|نمیایم|نمیاین|نمیای|نمیدونید|نمی‌دونیم|نمی‌دونین|نیستن|نیومدم|هستن|همزبون|همشون|پسرونه|پشت بوم|کوچیک|تمومه)",
+]
+
+
 def is_informal(text, threshold=1) -> bool:
     """
     Classifies Persian text into formal or informal based on predefined regex patterns and counts the number of informal matches.
@@ -38,50 +57,194 @@ def is_informal(text, threshold=1) -> bool:
 
     Args:
         text (str): The input Persian text.
+        threshold (int, optional): The number of informal matches needed to classify the text as informal. Defaults to 1.
 
     Returns:
         tuple: True or False
     """
-    informal_patterns = [
-        r"(?:ن?می‌? ?|ب|ن)(?:[یا]فشون|پاشون|پرورون|پرون|پوسون|پوشون|پیچون|تابون|تازون|ترسون|ترکون|تکون|تونست|جنبون|جوشون|چپون|چربون|چرخون|چرون|چسبون|چشون|چکون|چلون|خارون|خراشون|خشکون|خندون|خوابون|خورون|خون|خیسون|درخشون|رسون|رقصون|رنجون|رون|دون|سابون|ستون|سوزون|ش|شورون|غلتون|فهمون|کوبون|گذرون|گردون|گریون|گزین|گسترون|گنجون|لرزون|لغزون|لمبون|مالون|ا?نداز|نشون|هراسون|وزون)(?:م|ی|ه|یم|ید|ن)",
-        r"(?:ن?می‌? ?|ب|ن)(?:چا|خا|خوا)(?:م|ی|د|یم|ید|ن)",
-        r"(?:ن?می‌? ?|ب)(?:مون|شین|گ)(?:م|ی|ه|یم|ید|ن)",
-        r"(?:ن?می‌? ?|ن)(?:دون|د|تون)(?:م|ی|ه|یم|ید|ن)",
-        r"(?:نمی‌? ?|ن)(?:یا)(?:م|ه|یم|ید|ن)",
-        r"(?:می‌? ?)(?:ر)(?:م|ی|ه|یم|ید|ن)",
-        r"(?:ن?می‌? ?|ب|ن)(?:در|پا|کاه|گا|ایست)ن",
-        r"(?:ن?می‌? ?|ب|ن)دون(?:م|ی|ه|یم|ید|ن)",
-        r"(?:ازش|اونه?ا|ایشون|اینجوری?|این[وه]|بازم|باهاش|براتون|برام|بهش|بی‌خیال|تموم|چ?جوری|چیه|دیگه|کدوم|مونده|زبون|همینه)",
-        r"(?:آروم|آشیونه|آشیون|اومدم|برم|اونه|اون‌|ایرونی|اینا|بادمجون|بدونیم|بذار|بریم|بشیم|بشین|بنداز|بچگونه|بیابون|بیگیر|تهرون|تونستم|خمیردندون|خودتون|خودشون|خودمونی|خودمون)",
-        r"(?:خوروندن|خونه|خیابون|داره|داروخونه|داغون|دخترونه|دندون|رودخونه|زمونه|زنونه|سوزوندن|قلیون|مردونه|مهمون|موندم|میام|میونه|میون|می‌دونیم|نتونستم|ندونیم)",
-        r"(?:نذار|نریم|نسوزوندن|نشونه|نشون|نموندم|نمیاد|نمیام|نمیان|نمیایم|نمیاین|نمیای|نمیدونید|نمی‌دونیم|نمی‌دونین|نیستن|نیومدم|هستن|همزبون|همشون|پسرونه|پشت بوم|کوچیک|تمومه)",
-    ]
-
-    match_count = 0
-
-    for pattern in informal_patterns:
-        matches = re.findall(pattern, text)
-        match_count += len(matches)
-
-    classification = True if match_count >= threshold else False
-    return classification
+    return _get_formality_classifier().is_informal(text, threshold=threshold)
+
+
+class FormalityClassifier:
+    """
+    A precompiled classifier of Persian text into formal or informal.
+    The matches of every informal pattern are counted separately and added up, as in is_informal,
+    and counting stops as soon as the threshold is reached. The patterns are also merged into a
+    single alternation, which decides in one scan whether a text has any match at all.
+    Example:
+        >>> classifier = FormalityClassifier()
+        >>> classifier.classify(["میخوام برم خونه", "من به خانه می‌روم"])
+        [True, False]
+    """
+
+    def __init__(self, patterns: list[str] = None, threshold: int = 1):
+        """
+        Args:
+            patterns (list[str], optional): The informal regex patterns. Defaults to informal_patterns.
+            threshold (int, optional): The default number of matches needed to classify a text as informal. Defaults to 1.
+        """
+        self.patterns = patterns or informal_patterns
+        self.threshold = threshold
+        self._patterns = [regex.compile(pattern) for pattern in self.patterns]
+        self._pattern = regex.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.patterns)
+        )
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        """
+        Find the informal matches in the text.
+        Args:
+            text (str): The input Persian text.
+        Returns:
+            list[tuple[int, int]]: The (start, end) offsets of the matches of every pattern, sorted.
+        """
+        if self._pattern.search(text, concurrent=True) is None:
+            return []
+        return sorted(
+            match.span()
+            for pattern in self._patterns
+            for match in pattern.finditer(text, concurrent=True)
+        )
+
+    def count(self, text: str, limit: int = None) -> int:
+        """
+        Count the informal matches in the text.
+        Args:
+            text (str): The input Persian text.
+            limit (int, optional): Stop counting once this many matches are found. Defaults to None.
+        Returns:
+            int: The number of matches, at most limit.
+        """
+        if self._pattern.search(text, concurrent=True) is None:
+            return 0
+        match_count = 0
+        for pattern in self._patterns:
+            for _ in pattern.finditer(text, concurrent=True):
+                match_count += 1
+                if limit is not None and match_count >= limit:
+                    return match_count
+        return match_count
+
+    def is_informal(self, text: str, threshold: int = None) -> bool:
+        """
+        Classify a text as informal or formal.
+        Args:
+            text (str): The input Persian text.
+            threshold (int, optional): The number of matches needed. Defaults to the classifier threshold.
+        Returns:
+            bool: True if the text is informal, False otherwise.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        if threshold == 1:
+            return self._pattern.search(text, concurrent=True) is not None
+        return self.count(text, limit=threshold) >= threshold
+
+    def classify(
+        self, texts: Iterable[str], threshold: int = None, n_jobs: int = 1
+    ) -> list[bool]:
+        """
+        Classify a batch of texts.
+        Args:
+            texts (Iterable[str]): The input Persian texts.
+            threshold (int, optional): The number of matches needed. Defaults to the classifier threshold.
+            n_jobs (int, optional): The number of threads to use. Matching releases the GIL. Defaults to 1.
+        Returns:
+            list[bool]: True for each informal text, False otherwise.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        if n_jobs > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                return list(
+                    executor.map(lambda text: self.is_informal(text, threshold), texts)
+                )
+        return [self.is_informal(text, threshold) for text in texts]
+
+
+_formality_classifier = None
+
+
+def _get_formality_classifier() -> FormalityClassifier:
+    global _formality_classifier
+    if _formality_classifier is None:
+        _formality_classifier = FormalityClassifier()
+    return _formality_classifier
+
+
+_worker_state = {}
+
+
+def _init_worker(function, context):
+    _worker_state["function"] = function
+    _worker_state["context"] = context
+
+
+def _call_worker(item):
+    return _worker_state["function"](_worker_state["context"], item)
+
+
+def parallel_map(
+    function: Callable[[Any, Any], Any],
+    items: Iterable,
+    context: Any = None,
+    n_jobs: int = 1,
+) -> Iterator:
+    """
+    Apply a function to a stream of items in worker processes, yielding the results in order.
+    The context, e.g. a normalizer, is sent once to every worker instead of with every item, and
+    at most 2 * n_jobs items are in flight, so a corpus is streamed in bounded memory.
+    Args:
+        function (Callable[[Any, Any], Any]): A picklable function called as function(context, item).
+        items (Iterable): The items, consumed lazily.
+        context (Any, optional): The first argument of every call. Defaults to None.
+        n_jobs (int, optional): The number of worker processes, 1 to map in the calling process. Defaults to 1.
+    Returns:
+        Iterator: The results, in the order of the items.
+    """
+    if n_jobs <= 1:
+        for item in items:
+            yield function(context, item)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=_init_worker, initargs=(function, context)
+    ) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(_call_worker, item))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
 def load_vocab():
-    # Read the vocabulary table from the parquet file using Polars
-    vocab = pl.read_csv(vocab_csv_path)
-    return vocab
+    from shekar.lexicons import load_table
+
+    return load_table("vocab")
 
 
 def load_verbs():
-    verbs = pl.read_csv(verbs_csv_path)
-    return verbs
+    from shekar.lexicons import load_table
+
+    return load_table("verbs")
 
 
 def loadstopwords():
-    stopwords = pl.read_csv(stopwords_csv_path)
-    return stopwords
+    from shekar.lexicons import load_table
+
+    return load_table("stopwords")
+
+
+# data tables are loaded on first access, e.g. `utils.verbs`, and then kept as module attributes
+_data_loaders = {
+    "verbs": load_verbs,
+    "stopwords": loadstopwords,
+}
 
 
-verbs = load_verbs()
-stopwords = loadstopwords()
+def __getattr__(name):
+    if name in _data_loaders:
+        value = _data_loaders[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
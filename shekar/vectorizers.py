@@ -0,0 +1,213 @@
+import zlib
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from shekar.base import BaseTransformer
+from shekar.batch import TextBatch
+from shekar.normalizer import Normalizer
+from shekar.preprocessing import StopwordRemover
+from shekar.tokenizers import WordTokenizer
+from shekar.utils import parallel_map
+
+
+class HashingVectorizer(BaseTransformer):
+    """
+    Turns Persian texts into sparse bag-of-words or TF-IDF vectors with the hashing trick.
+    Texts are normalized, tokenized with WordTokenizer and stripped of stopwords and punctuation,
+    and every word or n-gram is hashed into one of n_features columns, so no vocabulary is kept.
+    The hash is crc32, which unlike hash() gives the same columns in every process.
+    The CSR matrices are built from array buffers of column indices, without a dictionary per
+    text. The document frequencies for IDF weighting are counted in a single streaming pass, and
+    chunks of texts can be processed in parallel.
+    Example:
+        >>> vectorizer = HashingVectorizer(n_features=2**18, ngram_range=(1, 2), use_idf=True)
+        >>> X = vectorizer.fit_transform(["کتاب را خواندم", "کتاب خوبی بود"])
+        >>> X.shape
+        (2, 262144)
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2**20,
+        ngram_range: tuple[int, int] = (1, 1),
+        use_idf: bool = False,
+        norm: str = "l2",
+        normalizer: Normalizer = None,
+        stopwords: Iterable[str] = None,
+        n_jobs: int = 1,
+        chunk_size: int = 10000,
+    ):
+        """
+        Args:
+            n_features (int, optional): The number of columns, at most 2**31. Defaults to 2**20.
+            ngram_range (tuple[int, int], optional): The smallest and largest n-grams of words. Defaults to (1, 1).
+            use_idf (bool, optional): Whether to weight the counts by the inverse document frequencies
+                learned by fit. Defaults to False.
+            norm (str, optional): "l2" to scale every row to unit length, None to keep the raw weights. Defaults to "l2".
+            normalizer (Normalizer, optional): The normalizer applied before tokenization. Defaults to Normalizer().
+            stopwords (Iterable[str], optional): The words to drop, an empty list to keep every word.
+                Defaults to the stopwords of StopwordRemover.
+            n_jobs (int, optional): The number of worker processes, 1 to vectorize in the calling process. Defaults to 1.
+            chunk_size (int, optional): The number of texts per task and per yielded matrix. Defaults to 10000.
+        """
+        if not 0 < n_features <= 2**31:
+            raise ValueError("n_features must be between 1 and 2**31.")
+        if not 1 <= ngram_range[0] <= ngram_range[1]:
+            raise ValueError(
+                "ngram_range must be (min_n, max_n) with 1 <= min_n <= max_n."
+            )
+        if norm not in ("l2", None):
+            raise ValueError('norm must be "l2" or None.')
+
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.use_idf = use_idf
+        self.norm = norm
+        self.normalizer = normalizer if normalizer is not None else Normalizer()
+        self.stopwords = frozenset(
+            StopwordRemover()._stopwords if stopwords is None else stopwords
+        )
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.idf_ = None
+        self.n_documents_ = 0
+
+    def _features(self, tokens: list[str]) -> list[str]:
+        words = [
+            token
+            for token in tokens
+            if token not in self.stopwords and (len(token) > 1 or token.isalnum())
+        ]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return words
+        features = list(words) if min_n == 1 else []
+        for n in range(max(2, min_n), max_n + 1):
+            features += [" ".join(words[i : i + n]) for i in range(len(words) - n + 1)]
+        return features
+
+    def _hash_chunk(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        # the column of every feature occurrence, and where the occurrences of every text start
+        batch = self.normalizer.normalize(TextBatch.from_texts(texts))
+        if len(batch) == len(texts):
+            token_lists = WordTokenizer.tokenize_batch(batch)
+        else:
+            # a gate dropped some texts, so they are normalized one by one and get empty rows
+            normalized = [self.normalizer.normalize(text) for text in texts]
+            kept = TextBatch.from_texts(text for text in normalized if text is not None)
+            kept_tokens = iter(WordTokenizer.tokenize_batch(kept))
+            token_lists = [
+                [] if text is None else next(kept_tokens) for text in normalized
+            ]
+
+        n_features = self.n_features
+        crc32 = zlib.crc32
+        indices = array("i")
+        indptr = array("q", [0])
+        for tokens in token_lists:
+            indices.extend(
+                [crc32(f.encode("utf-8")) % n_features for f in self._features(tokens)]
+            )
+            indptr.append(len(indices))
+        indices = np.frombuffer(indices, dtype=np.int32)
+        return indices, np.frombuffer(indptr, dtype=np.int64)
+
+    def _chunks(self, texts: Iterable[str]) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        if isinstance(texts, str):
+            raise ValueError("Input must be an Iterable of strings.")
+        texts = iter(texts)
+        chunks = iter(lambda: list(islice(texts, self.chunk_size)), [])
+        yield from parallel_map(
+            HashingVectorizer._hash_chunk, chunks, self, self.n_jobs
+        )
+
+    def _counts(self, indices: np.ndarray, indptr: np.ndarray):
+        from scipy.sparse import csr_matrix
+
+        counts = csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+        # repeated features of a text are summed into a single entry
+        counts.sum_duplicates()
+        return counts
+
+    def _weight(self, matrix):
+        if self.use_idf:
+            if self.idf_ is None:
+                raise ValueError("The IDF weights are not fitted, call fit first.")
+            matrix.data *= self.idf_[matrix.indices]
+        if self.norm == "l2":
+            squares = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+            norms = np.sqrt(squares, dtype=np.float32)
+            norms[norms == 0] = 1
+            matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+        return matrix
+
+    def fit(self, X: Iterable[str], y=None):
+        """
+        Learn the inverse document frequencies of the features in one pass over the texts.
+        Does nothing unless use_idf is True.
+        Args:
+            X (Iterable[str]): The texts.
+        Returns:
+            HashingVectorizer: The fitted vectorizer.
+        """
+        if not self.use_idf:
+            return self
+        document_frequencies = np.zeros(self.n_features, dtype=np.int64)
+        n_documents = 0
+        for indices, indptr in self._chunks(X):
+            counts = self._counts(indices, indptr)
+            document_frequencies += np.bincount(
+                counts.indices, minlength=self.n_features
+            )
+            n_documents += counts.shape[0]
+        # smoothed as if one more document contained every feature
+        self.idf_ = (np.log((1 + n_documents) / (1 + document_frequencies)) + 1).astype(
+            np.float32
+        )
+        self.n_documents_ = n_documents
+        return self
+
+    def transform_chunks(self, X: Iterable[str]) -> Iterator:
+        """
+        Vectorize a stream of texts, one matrix per chunk of texts.
+        Args:
+            X (Iterable[str]): The texts.
+        Returns:
+            Iterator[scipy.sparse.csr_matrix]: The (chunk_size, n_features) matrices, in order.
+        """
+        for indices, indptr in self._chunks(X):
+            yield self._weight(self._counts(indices, indptr))
+
+    def transform(self, X: Iterable[str]):
+        """
+        Vectorize texts.
+        Args:
+            X (Iterable[str]): The texts.
+        Returns:
+            scipy.sparse.csr_matrix: A (len(X), n_features) matrix of float32 weights.
+        """
+        from scipy.sparse import csr_matrix, vstack
+
+        matrices = list(self.transform_chunks(X))
+        if not matrices:
+            return csr_matrix((0, self.n_features), dtype=np.float32)
+        return vstack(matrices, format="csr")
+
+    def fit_transform(self, X: Iterable[str], y=None):
+        """
+        Learn the inverse document frequencies and vectorize the texts.
+        The texts are iterated twice when use_idf is True.
+        Args:
+            X (Iterable[str]): The texts.
+        Returns:
+            scipy.sparse.csr_matrix: A (len(X), n_features) matrix of float32 weights.
+        """
+        if self.use_idf and iter(X) is X:
+            X = list(X)
+        return self.fit(X).transform(X)
@@ -0,0 +1,49 @@
+import pytest
+from shekar.batch import TextBatch
+from shekar.normalizer import Normalizer
+from shekar.tokenizers import WordTokenizer
+
+
+texts = [
+    "ﻛﺘﺎﺏ‌ها  را   خواندم؟",
+    "",
+    "سلام!!! ٤٥ https://example.com/a?b هههههه 😀",
+    "ایمیل من test@example.com است",
+    "<b>متن</b>   \n\n\n\nپایان ",
+]
+
+
+@pytest.fixture
+def normalizer():
+    return Normalizer()
+
+
+def test_text_batch_round_trip():
+    batch = TextBatch.from_texts(texts)
+    assert len(batch) == len(texts)
+    assert batch.to_list() == texts
+    assert batch[2] == texts[2]
+    assert batch[-1] == texts[-1]
+    with pytest.raises(IndexError):
+        batch[len(texts)]
+    assert TextBatch.from_texts([]).to_list() == []
+
+
+def test_normalize_batch(normalizer):
+    expected = [normalizer.normalize(text) for text in texts]
+    result = normalizer.normalize(TextBatch.from_texts(texts))
+    assert isinstance(result, TextBatch)
+    assert result.to_list() == expected
+
+
+def test_normalize_batch_with_separator_in_text(normalizer):
+    separated = texts + ["یک" + TextBatch.separator + "دو"]
+    expected = [normalizer.normalize(text) for text in separated]
+    assert normalizer.normalize(TextBatch.from_texts(separated)).to_list() == expected
+
+
+def test_tokenize_batch():
+    batch = TextBatch.from_texts(texts)
+    assert WordTokenizer.tokenize_batch(batch) == [
+        WordTokenizer.tokenize(text) for text in texts
+    ]
@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+import pytest
+from shekar.corpus import VocabularyBuilder, read_frequencies, write_frequencies
+from shekar.normalizer import Normalizer
+from shekar.spell_checker import SpellChecker
+from shekar.tokenizers import WordTokenizer
+
+
+words = "من تو او ما كتاب کتاب خانه رفت آمد خوب بد بزرگ کوچک شهر روز شب کار".split()
+
+
+@pytest.fixture
+def corpus():
+    generator = random.Random(0)
+    return [
+        " ".join(generator.choices(words, k=generator.randint(0, 12)))
+        + generator.choice(["", "!", "\t۱۲", " 😀"])
+        for _ in range(500)
+    ]
+
+
+def count_directly(texts, min_count=1):
+    normalizer = Normalizer()
+    counts = Counter()
+    for text in texts:
+        counts.update(
+            t for t in WordTokenizer.tokenize(normalizer.normalize(text)) if t.strip()
+        )
+    return Counter({w: c for w, c in counts.items() if c >= min_count})
+
+
+def test_build(corpus):
+    assert VocabularyBuilder(chunk_size=64).build(corpus) == count_directly(corpus)
+
+
+def test_build_in_parallel_with_spilling(corpus, tmp_path):
+    builder = VocabularyBuilder(
+        min_count=20, n_jobs=2, chunk_size=50, memory_budget=2000, spill_dir=tmp_path
+    )
+    n_words = builder.build_to_file(iter(corpus), tmp_path / "frequencies.tsv")
+
+    assert builder.spilled_runs > 0
+    assert list(tmp_path.iterdir()) == [tmp_path / "frequencies.tsv"]
+    frequencies = read_frequencies(tmp_path / "frequencies.tsv")
+    assert len(frequencies) == n_words
+    assert frequencies == count_directly(corpus, min_count=20)
+
+
+def test_frequency_file(tmp_path):
+    path = tmp_path / "frequencies.tsv"
+    assert write_frequencies([("کتاب", 3), ("خانه", 1)], path) == 2
+    assert read_frequencies(path) == Counter({"کتاب": 3, "خانه": 1})
+    assert read_frequencies(path, min_count=2) == Counter({"کتاب": 3})
+
+    spell_checker = SpellChecker.from_frequencies(path)
+    assert spell_checker.correct("کتب")[0] == "کتاب"
@@ -0,0 +1,103 @@
+import random
+import pytest
+from shekar.deduplication import MinHashDeduplicator
+
+
+words = "من تو او ما کتاب خانه رفت آمد خوب بد بزرگ کوچک شهر روز شب کار".split()
+
+
+def make_documents(n, seed=0):
+    generator = random.Random(seed)
+    return [" ".join(generator.choices(words, k=40)) for _ in range(n)]
+
+
+def edit_one_word(document):
+    tokens = document.split()
+    tokens[len(tokens) // 2] = "تغییر"
+    return " ".join(tokens)
+
+
+@pytest.fixture
+def deduplicator():
+    return MinHashDeduplicator()
+
+
+def test_filter_drops_normalized_duplicates(deduplicator):
+    texts = ["کتاب را خواندم", "كتاب را خواندم", "متن دیگری است"]
+    assert list(deduplicator.filter(texts)) == ["کتاب را خواندم", "متن دیگری است"]
+
+
+def test_flag_near_duplicates(deduplicator):
+    documents = make_documents(300)
+    near_duplicates = [edit_one_word(document) for document in documents[:100]]
+    flags = list(deduplicator.flag(documents + near_duplicates, batch_size=64))
+
+    assert not any(flags[:300])
+    assert sum(flags[300:]) >= 90
+    assert len(deduplicator) == 300 + flags[300:].count(False)
+
+
+def test_signatures_are_stable(deduplicator):
+    documents = make_documents(5)
+    signatures = deduplicator.signatures(documents)
+    assert signatures.shape == (5, deduplicator.num_perm)
+    assert (MinHashDeduplicator().signatures(documents) == signatures).all()
+
+
+def test_bounded_index():
+    deduplicator = MinHashDeduplicator(max_index_size=10)
+    documents = make_documents(50)
+    assert not any(deduplicator.flag(documents))
+    assert len(deduplicator) == 10
+    assert all(len(buckets) <= 10 for buckets in deduplicator._buckets)
+
+    # evicted texts are no longer detected, recent ones are
+    assert not deduplicator.is_duplicate(documents[0])
+    assert deduplicator.is_duplicate(documents[-1])
+
+
+def test_save_and_load(deduplicator, tmp_path):
+    documents = make_documents(100)
+    list(deduplicator.flag(documents))
+    deduplicator.save(tmp_path / "index.pkl")
+
+    restored = MinHashDeduplicator.load(tmp_path / "index.pkl")
+    assert len(restored) == 100
+    assert restored.is_duplicate(edit_one_word(documents[7]))
+    assert not restored.is_duplicate(make_documents(1, seed=1)[0])
+
+
+def test_shared_band_keys_keep_every_text():
+    import numpy as np
+
+    deduplicator = MinHashDeduplicator(num_perm=8, bands=2, max_index_size=2)
+    first = np.array([1, 2, 3, 4, 5, 6, 7, 8], dtype=np.uint32)
+    second = np.array([1, 2, 3, 4, 9, 9, 9, 9], dtype=np.uint32)
+    unrelated = np.array([0, 0, 0, 0, 0, 0, 0, 0], dtype=np.uint32)
+    # only its first band matches, the one shared by first and second
+    near_second = np.array([1, 2, 3, 4, 9, 9, 9, 0], dtype=np.uint32)
+
+    assert not deduplicator._check(first)
+    assert not deduplicator._check(second)
+    assert not deduplicator._check(unrelated)  # evicts first
+    assert deduplicator._check(near_second)
+    assert all(len(buckets) <= 2 for buckets in deduplicator._buckets)
+
+
+def test_gated_normalizer_keeps_rows_aligned():
+    from shekar.normalizer import Normalizer
+    from shekar.pipeline import Pipeline
+    from shekar.preprocessing import ScriptRatioGate, AlphabetNormalizer
+
+    normalizer = Normalizer(
+        Pipeline(
+            steps=[
+                ("ScriptRatioGate", ScriptRatioGate()),
+                ("AlphabetNormalizer", AlphabetNormalizer()),
+            ]
+        )
+    )
+    deduplicator = MinHashDeduplicator(normalizer=normalizer)
+    texts = ["hello world", "کتاب را خواندم", "كتاب را خواندم"]
+    assert len(deduplicator.signatures(texts)) == 3
+    assert list(deduplicator.filter(texts)) == ["hello world", "کتاب را خواندم"]
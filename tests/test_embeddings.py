@@ -14,3 +14,96 @@ def test_model_urls():
 def test_load_model():
     embedding = Embedder()
     assert embedding.model.doesnt_match("خیار گوجه سنگ کاهو".split()) == "سنگ"
+
+
+@pytest.fixture
+def small_embedder(monkeypatch, tmp_path):
+    import numpy as np
+    from gensim.models import KeyedVectors
+
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(47)] + ["کتاب", "می‌روم", "۱۲"]
+    model = KeyedVectors(vector_size=8)
+    model.add_vectors(words, rng.normal(size=(50, 8)).astype(np.float32))
+    monkeypatch.setattr(Embedder, "load_model", lambda self, model_name: model)
+    monkeypatch.setattr(Embedder, "cache_dir", tmp_path)
+    return Embedder()
+
+
+def test_most_similar_batch(small_embedder):
+    words = ["w1", "w7", "oov", "w1"]
+    expected = [small_embedder.most_similar(w, topn=5) for w in words]
+    for memory_budget, n_jobs in [(256 * 1024**2, 1), (64, 1), (64, 3)]:
+        results = small_embedder.most_similar_batch(
+            words, topn=5, memory_budget=memory_budget, n_jobs=n_jobs
+        )
+        assert results[2] is None
+        for result, reference in zip(results, expected):
+            if reference is None:
+                continue
+            assert [w for w, _ in result] == [w for w, _ in reference]
+            assert [s for _, s in result] == pytest.approx([s for _, s in reference])
+
+
+def test_similarity_matrix(small_embedder):
+    import numpy as np
+
+    matrix = small_embedder.similarity_matrix(
+        ["w1", "oov", "w3"], ["w2", "w3"], memory_budget=16, n_jobs=2
+    )
+    assert matrix.shape == (3, 2)
+    assert np.isnan(matrix[1]).all()
+    assert matrix[0, 0] == pytest.approx(small_embedder.model.similarity("w1", "w2"))
+    assert matrix[2, 1] == pytest.approx(1.0)
+
+
+def test_normalized_lookup(small_embedder):
+    import numpy as np
+
+    assert np.array_equal(small_embedder["كِتاب"], small_embedder["کتاب"])
+    assert np.array_equal(small_embedder["میروم"], small_embedder["می‌روم"])
+    assert np.array_equal(small_embedder["12"], small_embedder["۱۲"])
+    assert small_embedder["ناموجود"] is None
+    assert small_embedder.most_similar("كتاب", topn=3) == small_embedder.most_similar(
+        "کتاب", topn=3
+    )
+
+    index_files = list(small_embedder.cache_dir.glob("*.index.pkl"))
+    assert len(index_files) == 1
+
+    reloaded = Embedder()
+    assert reloaded._get_lookup_index() == small_embedder._get_lookup_index()
+
+
+def test_vocabulary_restriction(small_embedder, tmp_path):
+    (tmp_path / "frequencies.tsv").write_text(
+        "w1\t5\nكتاب\t2\nunknown\t1\n", encoding="utf-8"
+    )
+    embedder = Embedder(vocabulary=tmp_path / "frequencies.tsv")
+
+    assert embedder.model.index_to_key == ["w1", "کتاب"]
+    assert (embedder["w1"] == small_embedder["w1"]).all()
+    assert embedder["w2"] is None
+    assert [w for w, _ in embedder.most_similar("w1", topn=5)] == ["کتاب"]
+
+
+def test_lookup_metrics(small_embedder):
+    from shekar.metrics import registry
+
+    registry.reset()
+    registry.enabled = True
+    try:
+        for word in ["کتاب", "كتاب", "ناموجود", "w1"]:
+            small_embedder[word]
+        snapshot = registry.snapshot()
+    finally:
+        registry.enabled = False
+        registry.reset()
+
+    lookups = {
+        sample["labels"]["result"]: sample["value"]
+        for sample in snapshot["shekar_embedder_lookups_total"]["values"]
+    }
+    assert lookups == {"hit": 2, "normalized_hit": 1, "oov": 1}
+    latency = snapshot["shekar_embedder_lookup_seconds"]["values"]
+    assert latency[0]["value"]["count"] == 4
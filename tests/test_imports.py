@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import json
+
+HEAVY_MODULES = ["gensim", "polars", "emoji", "numpy"]
+
+
+def run_import(statement):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_does_not_load_heavy_dependencies():
+    _, loaded = run_import("import shekar")
+    assert loaded == []
+
+    _, loaded = run_import("from shekar import Normalizer, Pipeline, SpellChecker")
+    assert loaded == []
+
+
+def test_normalizer_does_not_need_the_emoji_package():
+    _, loaded = run_import("from shekar import Normalizer; Normalizer()")
+    assert "emoji" not in loaded
+
+
+def test_import_time():
+    # the goal is well under 100 ms; the bound leaves room for slow CI machines
+    elapsed = min(run_import("from shekar import Normalizer")[0] for _ in range(3))
+    assert elapsed < 0.5
+
+
+def test_lazy_attributes():
+    import shekar
+    from shekar import utils
+
+    assert "Embedder" in dir(shekar)
+    assert shekar.Normalizer.__name__ == "Normalizer"
+    assert utils.stopwords.height > 0
+    assert utils.verbs.columns == ["present_stem", "past_stem"]
@@ -0,0 +1,108 @@
+import json
+import pytest
+from shekar.jobs import ShardedJob
+from shekar.normalizer import Normalizer
+from shekar.pipeline import Pipeline
+from shekar.preprocessing import SpacingStandardizer, StopwordRemover
+
+
+lines = ["ﻛﺘﺎﺏ‌ها  را   خواندم" + str(i) for i in range(95)] + ["", "سلام دنیا"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    paths = [tmp_path / "a.txt", tmp_path / "b.txt"]
+    paths[0].write_text("\n".join(lines) + "\n", encoding="utf-8")
+    paths[1].write_text("\n".join(lines[:30]), encoding="utf-8")
+    return paths
+
+
+def read_outputs(job):
+    return [
+        line
+        for path in job.outputs()
+        for line in path.read_text("utf-8").split("\n")[:-1]
+    ]
+
+
+def test_run_and_resume(corpus, tmp_path):
+    normalizer = Normalizer()
+    job = ShardedJob(normalizer, corpus, tmp_path / "out", shard_size=20, n_jobs=2)
+    assert [shard.name for shard in job.shards()][-2:] == [
+        "part-0001-00000.txt",
+        "part-0001-00001.txt",
+    ]
+    assert job.run() == {"processed": 7, "skipped": 0, "invalidated": 0}
+    expected = [normalizer.normalize(line) for line in lines + lines[:30]]
+    assert read_outputs(job) == expected
+
+    manifest = json.loads(job.manifest_path.read_text("utf-8"))
+    assert sum(entry["lines"] for entry in manifest["shards"].values()) == len(expected)
+    assert not list((tmp_path / "out").glob("*.tmp"))
+
+    # an interrupted run leaves shards missing from the manifest
+    del manifest["shards"]["part-0000-00002.txt"]
+    job.manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    job = ShardedJob(Normalizer(), corpus, tmp_path / "out", shard_size=20)
+    assert job.run() == {"processed": 1, "skipped": 6, "invalidated": 0}
+    assert read_outputs(job) == expected
+
+
+def test_invalidation(corpus, tmp_path):
+    def pipeline(stopwords):
+        return Pipeline(
+            steps=[
+                ("StopwordRemover", StopwordRemover(stopwords=stopwords)),
+                ("SpacingStandardizer", SpacingStandardizer()),
+            ]
+        )
+
+    ShardedJob(pipeline(["را"]), corpus, tmp_path / "out", shard_size=20).run()
+
+    job = ShardedJob(pipeline(["را"]), corpus, tmp_path / "out", shard_size=20)
+    assert job.run() == {"processed": 0, "skipped": 7, "invalidated": 0}
+
+    corpus[1].write_text("\n".join(lines[:25]), encoding="utf-8")
+    assert job.run() == {"processed": 2, "skipped": 5, "invalidated": 2}
+
+    job = ShardedJob(pipeline(["ها"]), corpus, tmp_path / "out", shard_size=20)
+    assert job.run() == {"processed": 7, "skipped": 0, "invalidated": 7}
+    assert read_outputs(job)[0] == "ﻛﺘﺎﺏ‌ها را خواندم0"
+
+    job = ShardedJob(pipeline(["ها"]), corpus, tmp_path / "out", shard_size=50)
+    assert job.run() == {"processed": 3, "skipped": 0, "invalidated": 7}
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "manifest.json",
+        "part-0000-00000.txt",
+        "part-0000-00001.txt",
+        "part-0001-00000.txt",
+    ]
+
+
+def test_multiline_outputs_are_rejected(tmp_path):
+    from shekar.preprocessing import HTMLTagRemover
+
+    path = tmp_path / "a.txt"
+    path.write_text("سلام\nیک&#10;دو\n", encoding="utf-8")
+    pipeline = Pipeline(steps=[("HTMLTagRemover", HTMLTagRemover())])
+    job = ShardedJob(pipeline, [path], tmp_path / "out")
+    with pytest.raises(ValueError, match="line 2 of shard part-0000-00000.txt"):
+        job.run()
+    assert not (tmp_path / "out" / "part-0000-00000.txt").exists()
+    assert not list((tmp_path / "out").glob("*.tmp"))
+
+
+def test_gated_lines_stay_aligned(tmp_path):
+    from shekar.preprocessing import ScriptRatioGate
+
+    path = tmp_path / "a.txt"
+    path.write_text("سلام   دنیا\nhello world\nکتاب\n", encoding="utf-8")
+    pipeline = Pipeline(
+        steps=[
+            ("ScriptRatioGate", ScriptRatioGate()),
+            ("SpacingStandardizer", SpacingStandardizer()),
+        ]
+    )
+    job = ShardedJob(pipeline, [path], tmp_path / "out")
+    job.run()
+    assert read_outputs(job) == ["سلام دنیا", "", "کتاب"]
@@ -0,0 +1,54 @@
+import pytest
+from shekar.lemmatizer import Lemmatizer, VerbForm, conjugate
+
+
+@pytest.fixture
+def lemmatizer():
+    return Lemmatizer()
+
+
+def test_lemmatize_verbs(lemmatizer):
+    assert lemmatizer.lemmatize("رفتم") == "رفت#رو"
+    assert lemmatizer.lemmatize("نمی‌روم") == "رفت#رو"
+    assert lemmatizer.lemmatize("نمیروم") == "رفت#رو"
+    assert lemmatizer.lemmatize("برو") == "رفت#رو"
+    assert lemmatizer.lemmatize("نرفته‌ایم") == "رفت#رو"
+    assert lemmatizer.lemmatize("بیاموزید") == "آموخت#آموز"
+    assert lemmatizer.lemmatize("نینداخت") == "انداخت#انداز"
+    assert lemmatizer.lemmatize("دارند") == "داشت#دار"
+
+
+def test_lemmatize_non_verbs(lemmatizer):
+    assert lemmatizer.lemmatize("کتاب") == "کتاب"
+    assert not lemmatizer.is_verb("کتاب")
+    assert lemmatizer.analyze("کتاب") is None
+
+
+def test_vocabulary_words_are_not_verbs():
+    lemmatizer = Lemmatizer(vocabulary=["نمک", "کتاب"])
+    assert lemmatizer.lemmatize("نمک") == "نمک"
+    assert lemmatizer.analyze("نمک") is None
+    assert not lemmatizer.is_verb("نمک")
+    assert lemmatizer.lemmatize_batch(["نمک", "نمکید"]) == ["نمک", "مکید#مک"]
+
+
+def test_analyze(lemmatizer):
+    assert lemmatizer.analyze("نمی‌خوانید") == VerbForm(
+        "خواند#خوان", "present", "2p", True
+    )
+    assert lemmatizer.analyze("بیایم") == VerbForm("آمد#آ", "subjunctive", "1s", False)
+    assert lemmatizer.analyze("خوانده") == VerbForm(
+        "خواند#خوان", "past_participle", None, False
+    )
+
+
+def test_lemmatize_batch(lemmatizer):
+    tokens = ["من", "کتاب", "را", "می‌خوانم"]
+    assert lemmatizer.lemmatize_batch(tokens) == ["من", "کتاب", "را", "خواند#خوان"]
+
+
+def test_conjugate():
+    forms = dict(conjugate("رفت", "رو"))
+    assert forms["رفتند"] == VerbForm("رفت#رو", "past", "3p", False)
+    assert forms["میرفتیم"] == VerbForm("رفت#رو", "past_continuous", "1p", False)
+    assert forms["رفتن"].tense == "infinitive"
@@ -0,0 +1,57 @@
+import pytest
+from shekar.preprocessing import LexiconMasker, LexiconMatcher
+
+
+@pytest.fixture
+def matcher():
+    return LexiconMatcher({"تهران": "CITY", "دانشگاه تهران": "ORG", "کتاب": "BOOK"})
+
+
+def test_spans(matcher):
+    text = "او در دانشگاه تهران کتاب می‌خواند"
+    assert matcher.spans(text) == [(6, 19, "ORG"), (20, 24, "BOOK")]
+    assert matcher.spans(text, overlapping=True) == [
+        (6, 19, "ORG"),
+        (14, 19, "CITY"),
+        (20, 24, "BOOK"),
+    ]
+    assert len(matcher) == 3
+    assert matcher.contains(text)
+    assert not matcher.contains("")
+
+
+def test_word_boundaries(matcher):
+    # a ZWNJ joins the parts of a word, punctuation separates words
+    assert matcher.spans("کتاب‌ها کتابخانه") == []
+    assert matcher.spans("«کتاب»، تهران.") == [(1, 5, "BOOK"), (8, 13, "CITY")]
+    assert matcher.spans("‌کتاب") == [(1, 5, "BOOK")]
+
+
+def test_normalized_matching():
+    matcher = LexiconMatcher(["می‌روم", "كتاب"], normalized=True)
+    assert [span[:2] for span in matcher.spans("كِتاب میروم")] == [(0, 5), (6, 11)]
+    assert LexiconMatcher(["کتاب"]).spans("كتاب") == []
+
+
+def test_suffix_terms():
+    matcher = LexiconMatcher(["a b c", "b c d", "c"])
+    assert matcher.spans("a b c d", overlapping=True) == [
+        (0, 5, "a b c"),
+        (2, 7, "b c d"),
+        (4, 5, "c"),
+    ]
+    assert matcher.spans("a b b c d") == [(4, 9, "b c d")]
+
+
+def test_masker(matcher, tmp_path):
+    text = "او در دانشگاه تهران کتاب می‌خواند"
+    assert LexiconMasker(matcher)(text) == "او در <MASK> <MASK> می‌خواند"
+    assert LexiconMasker(matcher, mask=None)(text) == "او در ORG BOOK می‌خواند"
+
+    matcher.save(tmp_path / "matcher.pkl")
+    restored = LexiconMatcher.load(tmp_path / "matcher.pkl")
+    assert restored.spans(text) == matcher.spans(text)
+    assert list(LexiconMasker(["کتاب"], mask="***")([text, "کتاب"])) == [
+        "او در دانشگاه تهران *** می‌خواند",
+        "***",
+    ]
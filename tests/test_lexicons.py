@@ -0,0 +1,89 @@
+import shutil
+import pytest
+from shekar import lexicons
+from shekar.utils import data_root_path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name in ["verbs.csv", "stopwords.csv"]:
+        shutil.copy(data_root_path / name, tmp_path / name)
+    lexicons.build(tmp_path)
+    return tmp_path
+
+
+def test_build(data_dir):
+    manifest = (data_dir / "manifest.json").read_text()
+    assert "vocab" not in manifest
+    assert (data_dir / "verbs.parquet").exists()
+    assert (data_dir / "stopwords.lex").exists()
+
+
+def test_load_compiled(data_dir):
+    stopwords = lexicons.load_lexicon("stopwords", data_dir)
+    assert isinstance(stopwords, lexicons.SortedLexicon)
+    table = lexicons.load_table("stopwords", data_dir)
+    assert set(stopwords) == set(table["word"].to_list())
+    assert "است" in stopwords
+    assert "کتاب" not in stopwords
+    assert "" not in stopwords
+    assert lexicons.load_table("verbs", data_dir).columns == [
+        "present_stem",
+        "past_stem",
+    ]
+
+
+def test_fallback_to_csv(data_dir):
+    (data_dir / "stopwords.lex").write_bytes(b"corrupted")
+    stopwords = lexicons.load_lexicon("stopwords", data_dir)
+    assert isinstance(stopwords, set)
+    assert "است" in stopwords
+
+    with open(data_dir / "stopwords.csv", "a", encoding="utf-8") as f:
+        f.write("\nشکر\n")
+    assert lexicons._artifact_path("stopwords", "table", data_dir) is None
+    assert "شکر" in lexicons.load_table("stopwords", data_dir)["word"].to_list()
+
+    (data_dir / "verbs.parquet").unlink()
+    assert lexicons.load_table("verbs", data_dir).height > 0
+
+
+def test_packaged_artifacts_are_valid():
+    for name in ["verbs", "stopwords"]:
+        assert lexicons._artifact_path(name, "table", data_root_path) is not None
+    assert lexicons._artifact_path("stopwords", "lexicon", data_root_path) is not None
+    assert lexicons._artifact_path("emoji", "table", data_root_path) is not None
+
+
+def test_emoji_table(data_dir):
+    emoji = pytest.importorskip("emoji")
+    table = lexicons.load_emoji_table(data_dir)
+    assert set(table) == set(emoji.EMOJI_DATA)
+    assert table["🏻"] and not table["😀"]
+
+    (data_dir / "emoji.tsv").write_text("😀\t0\n", encoding="utf-8")
+    assert lexicons.load_emoji_table(data_dir).keys() == emoji.EMOJI_DATA.keys()
+
+
+def test_unchanged_files_are_not_hashed(data_dir, monkeypatch):
+    hashed = []
+    checksum = lexicons.file_checksum
+    monkeypatch.setattr(
+        lexicons, "file_checksum", lambda path: hashed.append(path) or checksum(path)
+    )
+    assert lexicons._artifact_path("stopwords", "lexicon", data_dir) is not None
+    assert hashed == []
+
+    # a touched but identical file is hashed and still valid
+    source = data_dir / "stopwords.csv"
+    source.write_bytes(source.read_bytes())
+    assert lexicons._artifact_path("stopwords", "lexicon", data_dir) is not None
+    assert hashed == [source]
+
+
+def test_lexicon_pickle(data_dir):
+    import pickle
+
+    stopwords = lexicons.load_lexicon("stopwords", data_dir)
+    restored = pickle.loads(pickle.dumps(stopwords))
+    assert "است" in restored and len(restored) == len(stopwords)
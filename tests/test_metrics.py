@@ -0,0 +1,100 @@
+import threading
+import urllib.request
+from collections import Counter
+
+import pytest
+from shekar.metrics import MetricsRegistry, registry
+from shekar.spell_checker import SpellChecker
+from shekar.tokenizers import WordTokenizer
+
+
+@pytest.fixture
+def enabled_registry():
+    registry.reset()
+    registry.enabled = True
+    yield registry
+    registry.enabled = False
+    registry.reset()
+
+
+def values(name):
+    return registry.snapshot()[name]["values"]
+
+
+def test_metric_types():
+    metrics = MetricsRegistry(enabled=True)
+    counter = metrics.counter("requests_total", "Requests.", ("path",))
+    gauge = metrics.gauge("size", "Size.")
+    histogram = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+
+    def work():
+        for _ in range(1000):
+            counter.labels("/a").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gauge.set(7)
+    gauge.dec(2)
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests_total"]["values"] == [
+        {"labels": {"path": "/a"}, "value": 4000}
+    ]
+    assert snapshot["size"]["values"][0]["value"] == 5
+    histogram_value = snapshot["latency_seconds"]["values"][0]["value"]
+    assert histogram_value["count"] == 4
+    assert histogram_value["buckets"] == [(0.1, 2), (1, 3), (float("inf"), 4)]
+    assert metrics.counter("requests_total", "Requests.", ("path",)) is counter
+    with pytest.raises(ValueError):
+        metrics.gauge("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        counter.labels()
+
+
+def test_prometheus_format():
+    metrics = MetricsRegistry(enabled=True)
+    metrics.counter("tokens_total", "Tokens.", ("model",)).labels('a"b').inc(3)
+    metrics.histogram("latency_seconds", "Latency.", buckets=(0.5,)).observe(0.25)
+    assert metrics.to_prometheus() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.5"} 1\n'
+        'latency_seconds_bucket{le="+Inf"} 1\n'
+        "latency_seconds_sum 0.25\n"
+        "latency_seconds_count 1\n"
+        "# HELP tokens_total Tokens.\n"
+        "# TYPE tokens_total counter\n"
+        'tokens_total{model="a\\"b"} 3\n'
+    )
+
+    server = metrics.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.read().decode("utf-8") == metrics.to_prometheus()
+    finally:
+        server.shutdown()
+
+
+def test_disabled_registry_records_nothing():
+    registry.reset()
+    WordTokenizer.tokenize("سلام دنیا")
+    assert values("shekar_tokenizer_tokens_total")[0]["value"] == 0
+
+
+def test_tokenizer_and_spell_checker_metrics(enabled_registry):
+    WordTokenizer.tokenize("سلام دنیا")
+    assert values("shekar_tokenizer_texts_total")[0]["value"] == 1
+    assert values("shekar_tokenizer_tokens_total")[0]["value"] == 2
+
+    spell_checker = SpellChecker(n_edit=1, words=Counter({"سلام": 3, "دنیا": 1}))
+    assert spell_checker.correct("سلم")[0] == "سلام"
+    assert values("shekar_spellchecker_lookups_total")[0]["value"] == 1
+    candidates = values("shekar_spellchecker_candidates")[0]["value"]
+    assert candidates["sum"] == len(SpellChecker.generate_n_edits("سلم"))
+    assert values("shekar_spellchecker_lookup_seconds")[0]["value"]["count"] == 1
@@ -198,3 +198,244 @@ def test_normalize(normalizer):
     input_text = "ناصر گفت:«من می‌روم.» \u200c 🎉🎉🎊🎈she+kar@she-kar.io"
     expected_output = "ناصر گفت:«من می‌روم.»"
     assert normalizer.normalize(input_text) == expected_output
+
+
+def test_incremental_normalization(normalizer):
+    import random
+
+    pieces = ["سلام", "دنیا", "\n", "\n", " ", "  ", "می ", "ه ی ", "<b>", "</b>"]
+    pieces += ["&lt;", "😊", "http://x.com/a>b", "a@b.com", "ـــ", "ببببب", "‌"]
+    pieces += ["ك", "َ", "\n\n\n", "‹", ">", ".", "؟", "?", "...", "•", "،", "۱.۵"]
+    rng = random.Random(0)
+
+    for _ in range(50):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+        document = normalizer.incremental(text)
+        assert document.output == normalizer.normalize(text)
+        for _ in range(10):
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, min(5, len(text) - offset))
+            inserted = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+            text = text[:offset] + inserted + text[offset + deleted :]
+            assert document.edit(offset, deleted, inserted) == normalizer.normalize(
+                text
+            )
+            assert document.text == text
+
+
+def test_incremental_normalization_is_local(normalizer):
+    lines = ["کتاب‌های   خوب " + "ســــلام" * 3 + " دنیا" for _ in range(200)]
+    document = normalizer.incremental("\n".join(lines))
+    assert len(document._blocks) == 200
+
+    normalized = []
+    normalize = document.normalizer.normalize
+    document.normalizer.normalize = lambda text: (
+        normalized.append(text) or normalize(text)
+    )
+    text = document.text
+    offset = text.index("خوب", 1000)
+    output = document.edit(offset, 0, "بسیار ")
+    text = text[:offset] + "بسیار " + text[offset:]
+
+    assert output == normalize(text)
+    assert len(normalized) == 1
+
+
+def test_incremental_normalization_of_punctuated_prose(normalizer):
+    lines = ["این یک جمله   نمونه است." if i % 2 else "کجا می‌روی؟" for i in range(200)]
+    document = normalizer.incremental("\n".join(lines))
+    assert len(document._blocks) == 200
+
+    normalized = []
+    normalize = document.normalizer.normalize
+    document.normalizer.normalize = lambda text: (
+        normalized.append(text) or normalize(text)
+    )
+    text = document.text
+    offset = text.index("نمونه", 1000)
+    output = document.edit(offset, 0, "بسیار ")
+    text = text[:offset] + "بسیار " + text[offset:]
+
+    assert output == normalize(text)
+    assert len(normalized) == 1
+
+
+corpus_pieces = ["سلام", "دنیا", "\n", "\t", " ", "  ", "\xa0", "می ", "ه ی ", "<b>"]
+corpus_pieces += ["</b>", "😊", "http://x.com/a b", "a@b.com", "ـــ", "ببببب", "‌"]
+corpus_pieces += ["ك", "َ", "١٢", "﷽", "\n\n\n", "‹", ">", "\x1c\x1c\x1c"]
+
+
+def test_normalize_corpus(normalizer):
+    import random
+
+    rng = random.Random(0)
+    texts = [
+        "".join(rng.choice(corpus_pieces) for _ in range(rng.randint(0, 30)))
+        for _ in range(300)
+    ]
+    assert list(normalizer.normalize_corpus(texts, cache_size=16)) == [
+        normalizer.normalize(text) for text in texts
+    ]
+
+
+def test_token_local_steps():
+    import random
+    from shekar.preprocessing import transformations
+
+    rng = random.Random(0)
+    steps = [
+        cls()
+        for cls in vars(transformations).values()
+        if isinstance(cls, type) and getattr(cls, "token_local", False)
+    ]
+    assert len(steps) > 5
+    for step in steps:
+        for _ in range(100):
+            tokens = [
+                "".join(rng.choice(corpus_pieces).strip() for _ in range(3))
+                for _ in range(4)
+            ]
+            text = " ".join(tokens)
+            assert step(text) == " ".join(step(token) for token in tokens)
+
+
+def test_remove_emoji_like_the_emoji_package():
+    import random
+    from shekar.preprocessing import EmojiRemover
+
+    emoji = pytest.importorskip("emoji")
+    sequences = sorted(emoji.EMOJI_DATA)
+    pieces = ["سلام", " ", "a", "#", "1", "\u20e3", "\u200d", "\ufe0f", "\ufe0e", "©"]
+    pieces += ["\u200c", "\n", "🏻", "♀", "🏳", "🌈", "\u2029"]
+    rng = random.Random(0)
+    remover = EmojiRemover()
+    for _ in range(3000):
+        text = "".join(
+            rng.choice(sequences)[: rng.randint(1, 10)]
+            if rng.random() < 0.5
+            else rng.choice(pieces)
+            for _ in range(rng.randint(0, 20))
+        )
+        assert remover(text) == emoji.replace_emoji(text, replace="")
+
+
+def test_stream_html(normalizer):
+    from io import StringIO
+    from shekar.preprocessing import HTMLTagRemover
+
+    document = (
+        "<html><head><style>p {color: red}</style>"
+        '<script>if (a < b) x = "<p>";</script></head>'
+        "<body><!-- <p>پنهان</p> --><p class='a>b'>سلام &amp; دنیا</p>"
+        "<div>خط<br/>دوم &lt;تگ&gt; 3 < 5</div><script>unterminated"
+    )
+    expected = "\nسلام & دنیا\n\nخط\nدوم <تگ> 3 < 5\n"
+    for chunk_size in (1, 2, 7, 64, 1 << 16):
+        assert "".join(HTMLTagRemover.stream(document, chunk_size)) == expected
+    assert "".join(HTMLTagRemover.stream(StringIO(document))) == expected
+    chunks = ["<p>سلام &am", "p; دن", "یا</p", ">"]
+    assert "".join(HTMLTagRemover.stream(chunks)) == "\nسلام & دنیا\n"
+    assert normalizer.normalize("".join(HTMLTagRemover.stream(chunks))) == "سلام & دنیا"
+
+
+def test_stream_html_bounded_memory():
+    from shekar.preprocessing import HTMLTagRemover
+
+    chunks = ["<script>"] + ["x" * 1000] * 1000 + ["</script>پایان"]
+    pieces = list(HTMLTagRemover.stream(iter(chunks), chunk_size=1000))
+    assert "".join(pieces) == "پایان"
+
+
+def test_stream_html_is_independent_of_chunk_size():
+    from shekar.preprocessing import HTMLTagRemover
+
+    # the entities straddle the chunk boundaries around 1000, before long carried blocks
+    long = "x" * 300000
+    documents = [
+        "a &amp<script>" + long + "</script>b",
+        "a" * 998 + "&amp<script>" + long + "</script>b",
+        "a" * 998 + "&#1575<!--" + long + "-->b",
+        "a" * 997 + "&lt<" + long + "b",
+        "a" * 998 + "&amp;<b>" + "&#1575;" * 300 + "</b>c",
+    ]
+    for document in documents:
+        outputs = {
+            "".join(HTMLTagRemover.stream(document, chunk_size=chunk_size))
+            for chunk_size in (999, 1000, 1001, 1002, 4096, 1 << 20)
+        }
+        assert len(outputs) == 1
+    assert "".join(HTMLTagRemover.stream(documents[0])) == "a &b"
+
+
+def test_stream_html_comment_opener_inside_script():
+    from shekar.preprocessing import HTMLTagRemover
+
+    documents = {
+        '<script>var s = "<!--";</script><p>متن</p><p>بعد</p>': "\nمتن\n\nبعد\n",
+        '<script><!--\nvar a="</p>";\n</script><p>متن</p>': "\nمتن\n",
+        "<style>a::after {content: '<script>'}</style><p>متن</p>": "\nمتن\n",
+        "<p>متن <!-- <script> --> آخر</p><script>if (a<b) {}": "\nمتن  آخر\n",
+        "<div><noscript><style>x</style></noscript><b>سلام</b> &amp; دنیا</div>": (
+            "\nسلام & دنیا\n"
+        ),
+    }
+    for document, expected in documents.items():
+        # a single chunk holding the whole document is the reference conversion
+        assert "".join(HTMLTagRemover.stream(document, len(document) + 1)) == expected
+        for chunk_size in (1, 2, 3, 5, 8, 16, 64, 1000):
+            assert "".join(HTMLTagRemover.stream(document, chunk_size)) == expected
+
+
+def test_normalize_document(normalizer):
+    import random
+    from io import StringIO
+
+    pieces = ["سلام ", "دنیا ", " ", "می ", "ه ی ", "<b>", "</b>", "&lt;", "😊", "ـــ"]
+    pieces += ["http://x.com/a>b ", "a@b.com ", "ببببب", "‌", "ك", "َ", "‹", "\n"]
+    rng = random.Random(0)
+    lines = [
+        "کتاب " + "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8))) + " خوب"
+        for _ in range(400)
+    ]
+    text = "\n".join(lines)
+    expected = normalizer.normalize(text)
+
+    for chunk_size in (1, 100, 1 << 20):
+        pieces = list(normalizer.normalize_document(text, chunk_size=chunk_size))
+        assert "".join(pieces) == expected
+    assert len(pieces) == 1
+    pieces = normalizer.normalize_document(StringIO(text), n_jobs=2, chunk_size=500)
+    assert "".join(pieces) == expected
+    assert "".join(normalizer.normalize_document("")) == normalizer.normalize("")
+
+
+def test_normalize_document_splits_punctuated_prose(normalizer):
+    from shekar.normalizer import _document_blocks
+
+    for text in ["این یک جمله است.\n" * 2000, "کجا می‌روی؟ این   جمله است. " * 2000]:
+        blocks = list(_document_blocks(text, 1000))
+        assert len(blocks) > 30
+        assert "".join(block + after for block, _, after in blocks) == text
+        pieces = normalizer.normalize_document(text, chunk_size=1000)
+        assert "".join(pieces) == normalizer.normalize(text)
+
+
+def test_normalize_document_warns_without_safe_breaks(normalizer):
+    import warnings
+    from shekar.normalizer import _document_blocks
+
+    log = "2024-01-01 INFO worker 3 started\n" * 4000
+    paragraph = "این یک جمله بدون نقطه است و " * 4000
+    for text in [log, paragraph]:
+        with pytest.warns(RuntimeWarning, match="No safe break"):
+            assert len(list(_document_blocks(text, 1000))) == 1
+        with pytest.warns(RuntimeWarning) as record:
+            pieces = normalizer.normalize_document(text, chunk_size=1000)
+            assert "".join(pieces) == normalizer.normalize(text)
+        assert len(record) == 1
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        list(_document_blocks("این یک جمله است.\n" * 2000, 1000))
+        list(_document_blocks(log, len(log)))
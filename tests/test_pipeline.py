@@ -0,0 +1,109 @@
+import pickle
+import pytest
+from shekar import Pipeline
+from shekar.normalizer import Normalizer
+from shekar.batch import TextBatch
+from shekar.preprocessing import (
+    ScriptRatioGate,
+    SpacingStandardizer,
+    StopwordRemover,
+)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    normalizer = Normalizer()
+    normalizer.save(tmp_path / "normalizer.pkl")
+    restored = Normalizer.load(tmp_path / "normalizer.pkl")
+
+    texts = ["ۿدف ما ػمګ بۃ ێڪډيڱڕ إښټ", "کُجا نِشانِ قَدَم ناتَمام خواهَد ماند؟"]
+    assert list(restored.normalize(texts)) == list(normalizer.normalize(texts))
+
+
+def test_snapshot_keeps_configuration(tmp_path):
+    pipeline = Pipeline(
+        steps=[
+            ("StopwordRemover", StopwordRemover(stopwords=["از", "به"])),
+            ("SpacingStandardizer", SpacingStandardizer()),
+        ]
+    )
+    pipeline.save(tmp_path / "pipeline.pkl")
+    restored = Pipeline.load(tmp_path / "pipeline.pkl")
+    assert restored("از خانه به  مدرسه") == "خانه مدرسه"
+
+
+def rewrite_header(path, **changes):
+    with open(path, "rb") as f:
+        header = pickle.load(f)
+        payload = f.read()
+    header.update(changes)
+    with open(path, "wb") as f:
+        pickle.dump(header, f)
+        f.write(payload)
+    return header
+
+
+def test_stale_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "normalizer.pkl"
+    Normalizer().save(path)
+
+    with open(path, "rb") as f:
+        modules = pickle.load(f)["modules"]
+    assert "shekar.preprocessing.transformations" in modules
+    # the character tables the steps read at call time
+    assert "shekar.utils" in modules
+
+    rewrite_header(path, modules={**modules, "shekar.utils": "0" * 64})
+    with pytest.raises(ValueError, match="stale"):
+        Pipeline.load(path)
+
+    rewrite_header(
+        path, modules={**modules, "shekar.preprocessing.transformations": "0" * 64}
+    )
+    with pytest.raises(ValueError, match="stale"):
+        Pipeline.load(path)
+
+    rewrite_header(path, format=Pipeline.snapshot_format_version + 1)
+    with pytest.raises(ValueError, match="format"):
+        Pipeline.load(path)
+
+
+def test_script_ratio_scores():
+    gate = ScriptRatioGate()
+    scores = gate.scores(["سلام دنیا", "hello world", "سلام word", "۱۲۳ 😀 !!", ""])
+    assert list(scores) == [1.0, 0.0, 0.5, 1.0, 1.0]
+
+    histograms = gate.histograms(TextBatch.from_texts(["كتاب ۱۲", "abc"]))
+    counts = dict(zip(gate.script_classes, histograms[0]))
+    assert counts["arabic_letter"] == 1
+    assert counts["persian_letter"] == 3
+    assert counts["persian_digit"] == 2
+    assert histograms[1][gate.script_classes.index("latin")] == 3
+
+    # lone surrogates are neutral instead of failing the encoding
+    assert list(gate.scores(["سلام\ud800", "\udfff"])) == [1.0, 1.0]
+    assert gate("سلام\ud800") == "سلام\ud800"
+
+
+def test_script_ratio_gate_in_pipeline():
+    rejected = []
+    pipeline = Pipeline(
+        steps=[
+            ("ScriptRatioGate", ScriptRatioGate(0.6, on_reject=rejected.append)),
+            ("SpacingStandardizer", SpacingStandardizer()),
+        ]
+    )
+    texts = ["سلام   دنیا", "hello   world", "سلام world"]
+
+    assert list(pipeline(texts)) == ["سلام دنیا"]
+    assert rejected == ["hello   world", "سلام world"]
+    assert pipeline("hello world") is None
+    assert list(pipeline.transform(texts)) == ["سلام دنیا"]
+    assert pipeline(TextBatch.from_texts(texts)).to_list() == ["سلام دنیا"]
+
+    # a list is scored in chunks, not text by text
+    gate = pipeline.steps[0][1]
+    calls = []
+    scores = gate.scores
+    gate.scores = lambda texts: calls.append(len(texts)) or scores(texts)
+    assert list(pipeline(texts * 1000)) == ["سلام دنیا"] * 1000
+    assert calls == [1024, 1024, 952]
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from collections import Counter
+from shekar.normalizer import Normalizer
+from shekar.server import NormalizationServer
+from shekar.tokenizers import WordTokenizer
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def run_with_server(client, **kwargs):
+    async def main():
+        server = NormalizationServer(port=0, **kwargs)
+        await server.start()
+        try:
+            return await client(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_normalize_and_tokenize():
+    texts = ["ۿدف ما ػمګ بۃ ێڪډيڱڕ إښټ", "   این یک جمله   نمونه   است. "]
+
+    async def client(server):
+        single = await request(server.port, "POST", "/normalize", {"text": texts[0]})
+        batch = await request(server.port, "POST", "/normalize", {"texts": texts})
+        tokens = await request(server.port, "POST", "/tokenize", {"text": "سلام دنیا!"})
+        return single, batch, tokens
+
+    single, batch, tokens = run_with_server(client)
+    normalizer = Normalizer()
+    assert single == (200, {"result": normalizer.normalize(texts[0])})
+    assert batch == (200, {"results": list(normalizer.normalize(texts))})
+    assert tokens == (200, {"result": WordTokenizer.tokenize("سلام دنیا!")})
+
+
+def test_concurrent_requests_are_batched():
+    texts = [f"متن شماره {i}" for i in range(40)]
+
+    async def client(server):
+        responses = await asyncio.gather(
+            *(request(server.port, "POST", "/normalize", {"text": t}) for t in texts)
+        )
+        stats = await request(server.port, "GET", "/stats")
+        return responses, stats
+
+    responses, (status, stats) = run_with_server(
+        client, max_batch_size=16, max_delay=0.05
+    )
+    normalizer = Normalizer()
+    assert [r for _, r in responses] == [
+        {"result": normalizer.normalize(t)} for t in texts
+    ]
+
+    endpoint = stats["endpoints"]["normalize"]
+    assert status == 200
+    assert endpoint["requests"] == 40
+    assert endpoint["batches"] < 40
+    assert endpoint["latency_ms"]["p50"] is not None
+
+
+def test_errors_and_spellcheck():
+    async def client(server):
+        return [
+            await request(server.port, "POST", "/normalize", {"wrong": "x"}),
+            await request(server.port, "POST", "/unknown", {"text": "x"}),
+            await request(server.port, "POST", "/spellcheck", {"text": "سلان"}),
+        ]
+
+    bad_request, not_found, spellcheck = run_with_server(
+        client, spell_checker_words=Counter({"سلام": 10, "دنیا": 5})
+    )
+    assert bad_request[0] == 400
+    assert not_found[0] == 404
+    assert spellcheck == (200, {"result": "سلام"})
+
+
+def test_errors_stay_with_their_request():
+    # an uncorrectable word raises in SpellChecker.correct_text
+    texts = ["سلان", "qqqqqqqq", "دنیا"]
+
+    async def client(server):
+        return await asyncio.gather(
+            *(request(server.port, "POST", "/spellcheck", {"text": t}) for t in texts)
+        )
+
+    responses = run_with_server(
+        client,
+        max_batch_size=16,
+        max_delay=0.05,
+        spell_checker_words=Counter({"سلام": 10, "دنیا": 5}),
+    )
+    assert responses[0] == (200, {"result": "سلام"})
+    assert responses[1][0] == 500
+    assert responses[2] == (200, {"result": "دنیا"})
+
+
+def test_malformed_requests():
+    async def raw(port, data):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def client(server):
+        return [
+            await request(server.port, "POST", "/normalize", {"texts": "متن"}),
+            await request(server.port, "POST", "/normalize", {"texts": ["a", 1]}),
+            await raw(server.port, b"GARBAGE\r\n\r\n"),
+            await raw(
+                server.port, b"POST /normalize HTTP/1.1\r\nContent-Length: x\r\n\r\n"
+            ),
+        ]
+
+    string_texts, mixed_texts, bad_line, bad_length = run_with_server(client)
+    assert string_texts[0] == 400
+    assert mixed_texts[0] == 400
+    assert bad_line == 400
+    assert bad_length == 400
@@ -1,4 +1,4 @@
-from shekar.utils import is_informal
+from shekar.utils import is_informal, FormalityClassifier
 
 
 def test_is_informal():
@@ -9,3 +9,44 @@ def test_is_informal():
     input_text = "دیگه چه خبر؟"
     expected_output = True
     assert is_informal(input_text) == expected_output
+
+
+def test_formality_classifier():
+    classifier = FormalityClassifier()
+    texts = ["میخوام برم خونه، تو نمیای؟", "دیگه چه خبر؟", "من به خانه می‌روم"]
+
+    assert classifier.classify(texts) == [True, True, False]
+    assert classifier.classify(texts, n_jobs=2) == [True, True, False]
+    assert classifier.classify(texts, threshold=2) == [True, False, False]
+
+    assert classifier.count(texts[0]) == 4
+    assert classifier.count(texts[0], limit=2) == 2
+    assert classifier.spans(texts[1]) == [(0, 4)]
+    assert texts[1][0:4] == "دیگه"
+
+
+def test_counts_match_the_patterns_counted_separately():
+    import re
+    from shekar.utils import informal_patterns
+
+    classifier = FormalityClassifier()
+    texts = ["نمیدونم", "نمی‌دونیم که خونه", "میخوام برم خونه، تو نمیای؟", "خانه"]
+    for text in texts:
+        expected = sum(len(re.findall(p, text)) for p in informal_patterns)
+        assert classifier.count(text) == expected
+    assert classifier.count("نمیدونم") == 3
+    assert classifier.count("نمی‌دونیم که خونه") == 6
+    assert is_informal("نمیدونم", 2)
+    assert not is_informal("خانه")
+
+
+def test_parallel_map():
+    from shekar.utils import parallel_map
+
+    for n_jobs in (1, 2):
+        results = parallel_map(pow, range(20), 2, n_jobs=n_jobs)
+        assert list(results) == [2**i for i in range(20)]
+    # the items are consumed lazily
+    items = iter(range(50))
+    assert next(parallel_map(pow, items, 3)) == 1
+    assert next(items) == 1
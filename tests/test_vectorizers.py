@@ -0,0 +1,86 @@
+import random
+import zlib
+
+import numpy as np
+import pytest
+from shekar.vectorizers import HashingVectorizer
+
+
+words = "کتاب را خواندم خوب بود من شهر روز شب کار خانه بزرگ کوچک ، !".split()
+
+
+def make_texts(n, seed=0):
+    generator = random.Random(seed)
+    return [
+        " ".join(generator.choices(words, k=generator.randint(0, 20))) for _ in range(n)
+    ]
+
+
+def column(feature, n_features):
+    return zlib.crc32(feature.encode("utf-8")) % n_features
+
+
+def test_counts():
+    vectorizer = HashingVectorizer(n_features=2**10, norm=None, stopwords=["را"])
+    X = vectorizer.transform(["کتاب را خواندم، کتاب", ""])
+    assert X.shape == (2, 2**10)
+    assert X[0, column("کتاب", 2**10)] == 2
+    assert X[0, column("خواندم", 2**10)] == 1
+    assert X[0].nnz == 2
+    assert X[1].nnz == 0
+
+
+def test_ngrams():
+    vectorizer = HashingVectorizer(n_features=2**16, ngram_range=(2, 2), stopwords=[])
+    X = vectorizer.transform(["کتاب را خواندم"])
+    columns = {column("کتاب را", 2**16), column("را خواندم", 2**16)}
+    assert set(X.indices) == columns
+    assert np.allclose(X.data, 1 / np.sqrt(2))
+
+
+def test_idf():
+    texts = make_texts(500)
+    vectorizer = HashingVectorizer(n_features=2**12, use_idf=True, chunk_size=64)
+    X = vectorizer.fit_transform(iter(texts))
+    assert X.shape == (500, 2**12)
+    assert vectorizer.n_documents_ == 500
+    # the rarest word weighs more than the most frequent one
+    df = np.bincount(X.indices, minlength=2**12)
+    weights = vectorizer.idf_[df > 0]
+    assert weights.max() > weights.min() >= 1
+    norms = np.sqrt(X.multiply(X).sum(axis=1)).A.ravel()
+    assert np.allclose(norms[X.getnnz(axis=1) > 0], 1, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        HashingVectorizer(use_idf=True).transform(texts)
+
+
+def test_parallel_chunks():
+    texts = make_texts(300)
+    vectorizer = HashingVectorizer(n_features=2**12, ngram_range=(1, 2), chunk_size=50)
+    expected = vectorizer.transform(texts)
+    vectorizer.n_jobs = 2
+    assert (vectorizer.transform(texts) != expected).nnz == 0
+    chunks = list(vectorizer.transform_chunks(texts))
+    assert [chunk.shape[0] for chunk in chunks] == [50] * 6
+
+
+def test_gated_normalizer_keeps_rows_aligned():
+    from shekar.normalizer import Normalizer
+    from shekar.pipeline import Pipeline
+    from shekar.preprocessing import ScriptRatioGate
+
+    normalizer = Normalizer(Pipeline(steps=[("ScriptRatioGate", ScriptRatioGate())]))
+    texts = ["hello world", "کتاب را خواندم", "some english", "خوب بود"]
+    for n_jobs in (1, 2):
+        vectorizer = HashingVectorizer(
+            n_features=2**10,
+            normalizer=normalizer,
+            stopwords=[],
+            n_jobs=n_jobs,
+            chunk_size=2,
+        )
+        X = vectorizer.transform(texts)
+        assert X.shape == (4, 2**10)
+        assert list(X.getnnz(axis=1)) == [0, 3, 0, 2]
+        assert X[3, column("خوب", 2**10)] > 0